@@ -0,0 +1,97 @@
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+
+VERSION_KEY = 'content_version'
+LOCK_POLL_INTERVAL = 0.05
+
+
+def content_version():
+    """Номер версии публичного контента; входит в ключи кэша страниц."""
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_content_version(**kwargs):
+    """Сбрасывает кэш страниц: старые ключи просто перестают читаться.
+
+    Подходит как обработчик сигналов post_save/post_delete.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def get_or_compute(key, compute, timeout, beta=1.0, lock_timeout=10):
+    """Значение из кэша или результат compute() без "грохочущего стада".
+
+    Пересчитывает значение только тот запрос, который захватил
+    блокировку ключа; остальные тем временем получают устаревшее
+    значение. Чтобы пересчёт не начинался у всех одновременно в момент
+    истечения, он запускается заранее с вероятностью, растущей к концу
+    срока (XFetch): чем дольше считается значение и чем больше beta,
+    тем раньше. Устаревшее значение хранится ещё timeout секунд.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at, delta = entry
+        early = delta * beta * math.log(1 - random.random())
+        if time.time() - early < expires_at:
+            return value
+    lock_key = f'{key}:lock'
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, lock_timeout):
+        if entry is not None:
+            return entry[0]
+        # Значения ещё нет совсем: ждём, пока его посчитает другой запрос
+        deadline = time.time() + lock_timeout
+        while time.time() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+        # Не дождались: считаем сами, блокировку берём, если она истекла
+        if not cache.add(lock_key, token, lock_timeout):
+            token = None
+    try:
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        cache.set(key, (value, time.time() + timeout, delta), timeout * 2)
+    finally:
+        # За время пересчёта блокировка могла истечь и достаться другому
+        # запросу: снимается только своя
+        if token is not None and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    return value
+
+
+def cached_page(key, queryset, number, timeout):
+    """Страница пагинатора через get_or_compute.
+
+    В кэш попадают только объекты страницы и общее число объектов,
+    а не весь queryset, который читал бы при пиклинге всю таблицу.
+    Номер страницы из запроса сначала приводится к существующей
+    странице, поэтому ключей в кэше не больше, чем страниц.
+    """
+    paginator = Paginator(queryset, settings.POSTS_PER_PAGE)
+    paginator.count = get_or_compute(
+        f'{key}:count', queryset.count, timeout
+    )
+    try:
+        number = paginator.validate_number(number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+    object_list = get_or_compute(
+        f'{key}:{number}',
+        lambda: list(paginator.page(number).object_list),
+        timeout
+    )
+    return Page(object_list, number, paginator)
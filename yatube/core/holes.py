@@ -0,0 +1,48 @@
+import json
+import re
+from urllib.parse import quote, unquote
+
+from django.template.loader import render_to_string
+
+registry = {}
+
+MARKER = re.compile(
+    r'<!--hole:(?P<name>[\w.]+):(?P<args>[^>]*)-->.*?<!--/hole-->', re.S
+)
+
+
+def hole(name, template_name):
+    """Регистрирует персональный фрагмент страницы ("дырку").
+
+    Функция получает request и аргументы из шаблона и возвращает
+    контекст для template_name. Аргументы должны быть простыми
+    значениями: они хранятся прямо в закэшированной странице.
+    """
+    def decorator(func):
+        registry[name] = (template_name, func)
+        return func
+    return decorator
+
+
+def render_hole(request, name, args):
+    template_name, get_context = registry[name]
+    html = render_to_string(
+        template_name, get_context(request, *args), request=request
+    )
+    encoded = quote(json.dumps(args))
+    return f'<!--hole:{name}:{encoded}-->{html}<!--/hole-->'
+
+
+def fill_holes(content, request):
+    """Перерисовывает все фрагменты страницы для текущего пользователя."""
+    return MARKER.sub(
+        lambda match: render_hole(
+            request, match['name'], json.loads(unquote(match['args']))
+        ),
+        content
+    )
+
+
+@hole('core.header_user', 'includes/header_user.html')
+def header_user(request):
+    return {}
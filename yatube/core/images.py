@@ -0,0 +1,107 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.helpers import ThumbnailError
+
+MIME_TYPES = {
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+}
+
+
+def available_formats():
+    """Форматы из настроек, которые умеет сохранять установленный Pillow.
+
+    Pillow может быть собран без libwebp; тогда остаётся только JPEG.
+    """
+    Image.init()
+    return [
+        image_format for image_format in settings.RESPONSIVE_IMAGE_FORMATS
+        if image_format in Image.SAVE
+    ]
+
+
+def stored_size(image):
+    """Размеры оригинала из полей <поле>_width и <поле>_height модели.
+
+    Файл при этом не читается; если полей нет, размеры неизвестны.
+    """
+    name = image.field.attname
+    return (getattr(image.instance, f'{name}_width', None),
+            getattr(image.instance, f'{name}_height', None))
+
+
+def variant_sizes(image):
+    """Ширины и высоты вариантов картинки с пропорциями кадрирования.
+
+    Варианты шире оригинала не нужны: браузер всё равно получит
+    растянутую картинку. Самый узкий вариант есть всегда.
+    """
+    ratio_width, ratio_height = settings.RESPONSIVE_IMAGE_RATIO
+    original_width, _ = stored_size(image)
+    widths = sorted(settings.RESPONSIVE_IMAGE_WIDTHS)
+    if original_width:
+        widths = [
+            width for width in widths if width <= original_width
+        ] or widths[:1]
+    return [
+        (width, round(width * ratio_height / ratio_width)) for width in widths
+    ]
+
+
+def variants(image):
+    """Миниатюры всех размеров во всех форматах: {формат: [миниатюры]}.
+
+    Отсутствующие миниатюры создаются, поэтому при загрузке картинки
+    достаточно вызвать функцию один раз в фоновой задаче.
+    """
+    result = {}
+    for image_format in available_formats():
+        result[image_format] = [
+            get_thumbnail(
+                image, f'{width}x{height}',
+                crop='center', upscale=True, format=image_format
+            )
+            for width, height in variant_sizes(image)
+        ]
+        # sorl не бросает исключение, если не смог прочитать оригинал
+        if not all(thumbnail.size for thumbnail in result[image_format]):
+            raise ThumbnailError(f'Не удалось прочитать {image.name}')
+    return result
+
+
+def variants_key(name):
+    options = (settings.RESPONSIVE_IMAGE_WIDTHS,
+               settings.RESPONSIVE_IMAGE_RATIO, available_formats())
+    digest = hashlib.md5(f'{name}:{options}'.encode()).hexdigest()
+    return f'image_variants:{digest}'
+
+
+def cached_variants(image):
+    """variants() в виде {формат: [(url, ширина, высота)]} из кэша.
+
+    Имя файла - хэш содержимого, поэтому варианты для имени не
+    меняются, и sorl опрашивается раз на картинку, а не при каждой
+    отрисовке карточки.
+    """
+    key = variants_key(image.name)
+    result = cache.get(key)
+    if result is None:
+        result = {
+            image_format: [
+                (thumbnail.url, thumbnail.width, thumbnail.height)
+                for thumbnail in thumbnails
+            ]
+            for image_format, thumbnails in variants(image).items()
+        }
+        cache.set(key, result, settings.RESPONSIVE_IMAGE_CACHE_TIMEOUT)
+    return result
+
+
+def forget_variants(name):
+    """Сбрасывает список вариантов вместе с удалёнными миниатюрами."""
+    cache.delete(variants_key(name))
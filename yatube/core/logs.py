@@ -0,0 +1,149 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.utils.module_loading import import_string
+
+# Атрибуты, которые есть у любой записи лога; остальное - extra
+STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON вместе с полями из extra."""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, который пишет записи пачками.
+
+    Отформатированные записи копятся в памяти и уходят в файл одной
+    операцией записи, когда их набирается batch_size или когда
+    вызывается flush(). Файл переключается по размеру maxBytes
+    перед записью пачки.
+    """
+
+    def __init__(self, filename, batch_size=100, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.buffer:
+                data = ''.join(self.buffer)
+                self.buffer.clear()
+                if self.stream is None:
+                    self.stream = self._open()
+                size = self.stream.tell()
+                if self.maxBytes and size and \
+                        size + len(data.encode()) > self.maxBytes:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                self.stream.write(data)
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class FlushingListener(QueueListener):
+    """QueueListener, сбрасывающий буферы handler'ов в паузах.
+
+    Пачка не ждёт следующей записи дольше flush_interval секунд.
+    """
+
+    def __init__(self, records, *handlers, flush_interval=1, **kwargs):
+        super().__init__(records, *handlers, **kwargs)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class AsyncHandler(QueueHandler):
+    """Кладёт записи в очередь, а пишет их фоновый поток.
+
+    Поток запроса не ждёт диска: форматирование и запись делает
+    handler класса target (остальные аргументы передаются ему),
+    работающий в QueueListener.
+    """
+
+    def __init__(self, target, flush_interval=1, **kwargs):
+        super().__init__(queue.SimpleQueue())
+        filename = kwargs.get('filename')
+        if filename:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.target = import_string(target)(**kwargs)
+        self.listener = FlushingListener(
+            self.queue, self.target, flush_interval=flush_interval,
+            respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Сообщение и текст исключения нужно получить в потоке, где они
+        # возникли; форматирование остаётся фоновому потоку
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def stop(self):
+        """Дописывает оставшиеся в очереди записи."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+            self.target.flush()
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
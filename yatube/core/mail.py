@@ -0,0 +1,97 @@
+import pickle
+import socketserver
+import threading
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from .models import OutgoingEmail
+from .tasks import schedule_delivery
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Сохраняет письма в БД и сразу возвращает управление.
+
+    Отправляет их задача deliver_emails через QUEUED_EMAIL_BACKEND,
+    поэтому медленный SMTP-сервер не задерживает запрос.
+    """
+
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            message.connection = None
+            emails.append(OutgoingEmail(
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+                message=pickle.dumps(message),
+            ))
+        if not emails:
+            return 0
+        OutgoingEmail.objects.bulk_create(emails)
+        transaction.on_commit(schedule_delivery)
+        return len(emails)
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-диалог: принимает письмо и ничего не отправляет."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 yatube smtp sink')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline().decode('utf-8', 'replace').strip()
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            if command in ('HELO', 'EHLO', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif command == 'MAIL':
+                sender, recipients = line[10:].strip('<>'), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipients.append(line[8:].strip('<>'))
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for raw in self.rfile:
+                    if raw.rstrip(b'\r\n') == b'.':
+                        break
+                    data.append(raw)
+                self.server.deliver(sender, recipients, b''.join(data))
+                self.reply('250 OK')
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """SMTP-сервер для проверки отправки писем без настоящей почты.
+
+    Письма складываются в messages, число соединений - в connections.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0), on_message=None):
+        super().__init__(address, SMTPSinkHandler)
+        self.messages = []
+        self.connections = 0
+        self.on_message = on_message
+        self.lock = threading.Lock()
+
+    def deliver(self, sender, recipients, data):
+        with self.lock:
+            self.messages.append((sender, recipients, data))
+        if self.on_message:
+            self.on_message(sender, recipients, data)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
@@ -0,0 +1,62 @@
+from statistics import median
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import Resolver404, resolve
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время до первого байта и полное время ответа '
+            'при обычной и потоковой отрисовке страницы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Адрес страницы, например /')
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Сколько запросов сделать в каждом режиме'
+        )
+        parser.add_argument(
+            '--user', help='Делать запросы от имени этого пользователя'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            view_name = resolve(path.split('?')[0]).view_name
+        except Resolver404:
+            raise CommandError(f'Адрес {path} не найден')
+        client = Client()
+        if options['user']:
+            client.force_login(
+                get_user_model().objects.get(username=options['user'])
+            )
+        modes = (('render', ()), ('stream', (view_name,)))
+        for label, views in modes:
+            # Кэш страниц отдал бы готовый ответ и исказил замер
+            with override_settings(STREAM_RENDER_VIEWS=views,
+                                   PAGE_CACHE_VIEWS={}):
+                ttfb, total = self.measure(client, path, options['requests'])
+            self.stdout.write(
+                f'{label}: первый байт {ttfb * 1000:.1f} мс, '
+                f'весь ответ {total * 1000:.1f} мс (медиана)'
+            )
+
+    @staticmethod
+    def measure(client, path, count):
+        ttfbs, totals = [], []
+        for _ in range(count):
+            started = perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                content = iter(response.streaming_content)
+                next(content, None)
+                first_byte = perf_counter()
+                for _ in content:
+                    pass
+            else:
+                first_byte = perf_counter()
+            ttfbs.append(first_byte - started)
+            totals.append(perf_counter() - started)
+        return median(ttfbs), median(totals)
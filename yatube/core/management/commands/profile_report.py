@@ -0,0 +1,75 @@
+import os
+import pstats
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = ('Сводка самых дорогих функций по сохранённым профилям '
+            'представлений')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url_names', nargs='*',
+            help='Представления, например posts:index (по умолчанию все)'
+        )
+        parser.add_argument(
+            '--top', type=int, default=20, help='Сколько функций показать'
+        )
+        parser.add_argument(
+            '--sort', default='cumulative',
+            choices=('cumulative', 'tottime', 'calls'),
+            help='Порядок сортировки для профилей cProfile'
+        )
+        parser.add_argument(
+            '--token', action='store_true',
+            help='Выдать значение заголовка PROFILER_HEADER и выйти'
+        )
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(f'{settings.PROFILER_HEADER}: {make_token()}')
+            return
+        if not os.path.isdir(settings.PROFILER_DIR):
+            self.stdout.write('Профилей пока нет')
+            return
+        directories = [
+            name.replace(':', '.') for name in options['url_names']
+        ] or sorted(os.listdir(settings.PROFILER_DIR))
+        for directory in directories:
+            path = os.path.join(settings.PROFILER_DIR, directory)
+            if not os.path.isdir(path):
+                self.stdout.write(f'Нет профилей для {directory}')
+                continue
+            files = [os.path.join(path, name) for name in os.listdir(path)]
+            profiles = [name for name in files if name.endswith('.prof')]
+            samples = [name for name in files if name.endswith('.collapsed')]
+            if profiles:
+                self.stdout.write(
+                    f'== {directory}: {len(profiles)} профилей cProfile'
+                )
+                stats = pstats.Stats(*profiles, stream=self.stdout)
+                stats.sort_stats(options['sort']).print_stats(options['top'])
+            if samples:
+                self.stdout.write(
+                    f'== {directory}: {len(samples)} профилей по выборкам'
+                )
+                self.report_samples(samples, options['top'])
+
+    def report_samples(self, files, top):
+        """Функции, чаще всего оказывавшиеся на вершине стека."""
+        own, total = Counter(), 0
+        for name in files:
+            with open(name) as samples:
+                for line in samples:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    own[stack.rpartition(';')[2]] += int(count)
+                    total += int(count)
+        for function, count in own.most_common(top):
+            self.stdout.write(
+                f'{count:8d} {count / total:7.1%}  {function}'
+            )
@@ -0,0 +1,70 @@
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Сводка медленных и повторяющихся SQL-запросов из журнала'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=None,
+            help='Файл журнала (по умолчанию QUERY_LOG_FILE)'
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько шаблонов запросов показать'
+        )
+        parser.add_argument(
+            '--view', help='Только запросы этого представления'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.QUERY_LOG_FILE
+        try:
+            with open(path) as log:
+                entries = [self.parse(line) for line in log]
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {path} не найден')
+        groups = defaultdict(lambda: {
+            'count': 0, 'total': 0, 'max': 0, 'kinds': Counter(),
+            'views': Counter(), 'origins': Counter(), 'sql': '',
+        })
+        for query in entries:
+            if query is None or (
+                options['view'] and query['view'] != options['view']
+            ):
+                continue
+            group = groups[query['id']]
+            group['count'] += 1
+            group['total'] += query['duration_ms']
+            group['max'] = max(group['max'], query['duration_ms'])
+            group['kinds'][query['kind']] += 1
+            group['views'][query['view']] += 1
+            group['origins'][query['template'] or query['code']] += 1
+            group['sql'] = query['fingerprint']
+        ranked = sorted(
+            groups.items(), key=lambda item: item[1]['total'], reverse=True
+        )
+        for query_id, group in ranked[:options['top']]:
+            kinds = ', '.join(
+                f'{kind} x{count}' for kind, count in group['kinds'].items()
+            )
+            self.stdout.write(
+                f'{query_id}: {group["count"]} записей ({kinds}), '
+                f'всего {group["total"]:.1f} мс, макс. {group["max"]:.1f} мс'
+            )
+            self.stdout.write(f'  {group["sql"][:200]}')
+            for view, count in group['views'].most_common(3):
+                self.stdout.write(f'  представление {view}: {count}')
+            for origin, count in group['origins'].most_common(3):
+                self.stdout.write(f'  источник {origin}: {count}')
+
+    @staticmethod
+    def parse(line):
+        try:
+            return json.loads(line)['query']
+        except (ValueError, KeyError):
+            return None
@@ -0,0 +1,34 @@
+from email import message_from_bytes
+
+from django.core.management.base import BaseCommand
+
+from core.mail import SMTPSink
+
+
+class Command(BaseCommand):
+    help = ('Запускает SMTP-сервер, который принимает письма и выводит их '
+            'в консоль (для проверки QUEUED_EMAIL_BACKEND = smtp)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+
+    def handle(self, *args, **options):
+        sink = SMTPSink(
+            (options['host'], options['port']), on_message=self.show
+        )
+        self.stdout.write(
+            f'SMTP на {options["host"]}:{options["port"]}, Ctrl+C - выход'
+        )
+        try:
+            sink.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.server_close()
+
+    def show(self, sender, recipients, data):
+        message = message_from_bytes(data)
+        self.stdout.write(
+            f'{sender} -> {", ".join(recipients)}: {message["Subject"]}'
+        )
@@ -0,0 +1,205 @@
+import hashlib
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+
+from .cache import content_version
+from .holes import fill_holes
+from .profiling import check_token, profile_call
+from .queries import QueryInspector
+from .ratelimit import bucket_key, identity, take
+from .signals import page_cache_hit
+
+access_logger = logging.getLogger('yatube.access')
+
+
+class PageCacheMiddleware:
+    """Кэш целых страниц, отданных анонимным пользователям.
+
+    Кэшируются GET-запросы к представлениям из PAGE_CACHE_VIEWS;
+    ключ учитывает только перечисленные там параметры запроса и версию
+    контента. Вошедшие пользователи получают ту же страницу, в которой
+    перерисованы персональные фрагменты {% hole %}.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, 'page_cache_key', None)
+        if key and self.can_store(request, response):
+            cache.set(
+                key,
+                (response.content, response['Content-Type']),
+                settings.PAGE_CACHE_TIMEOUT
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        url_name = request.resolver_match.view_name
+        params = settings.PAGE_CACHE_VIEWS.get(url_name)
+        if params is None or not settings.PAGE_CACHE_TIMEOUT:
+            return None
+        query = '&'.join(
+            f'{param}={request.GET.get(param, "")}' for param in params
+        )
+        digest = hashlib.md5(
+            f'{request.path}?{query}'.encode()
+        ).hexdigest()
+        key = f'page:{content_version()}:{digest}'
+        cached = cache.get(key)
+        if cached is None:
+            request.page_cache_key = key
+            return None
+        content, content_type = cached
+        page_cache_hit.send(
+            sender=self.__class__, request=request,
+            url_name=url_name, kwargs=view_kwargs
+        )
+        if request.user.is_authenticated:
+            content = fill_holes(content.decode(), request)
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Page-Cache'] = 'hit'
+        return response
+
+    @staticmethod
+    def can_store(request, response):
+        return (
+            not request.user.is_authenticated
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        )
+
+
+class AccessLogMiddleware:
+    """Журнал запросов в 'yatube.access' в виде структурированных записей.
+
+    Время, которое ушло на саму запись в журнал, отдаётся в заголовке
+    Server-Timing вместе со временем ответа. Должен стоять первым
+    в MIDDLEWARE, чтобы учитывать работу остальных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        queries = getattr(request, 'queries', None)
+        user = getattr(request, 'user', None)
+        access_logger.info(
+            '%s %s %s', request.method, request.path, response.status_code,
+            extra={'access': {
+                'method': request.method,
+                'path': request.path,
+                'url_name': match and match.view_name,
+                'status': response.status_code,
+                'duration_ms': round(duration, 3),
+                'queries': queries and queries.count,
+                'queries_ms': queries and round(queries.duration, 3),
+                'user_id': user.pk if user and user.is_authenticated
+                else None,
+            }}
+        )
+        overhead = (time.perf_counter() - started) * 1000 - duration
+        response['Server-Timing'] = (
+            f'app;dur={duration:.3f}, log;dur={overhead:.3f}'
+        )
+        return response
+
+
+class RateLimitMiddleware:
+    """Ограничивает частоту запросов к пишущим представлениям.
+
+    Лимиты задаются в RATE_LIMITS по имени URL и считаются только для
+    перечисленных там методов: у каждого вошедшего пользователя
+    и у каждого IP-адреса гостя своя корзина токенов (core.ratelimit).
+    Сверх лимита отвечает 429 с заголовком Retry-After. Запросы к прочим
+    URL обходятся одним поиском в словаре.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name = request.resolver_match.view_name
+        limit = settings.RATE_LIMITS.get(name)
+        if limit is None:
+            return None
+        capacity, period, methods = limit
+        if request.method not in methods:
+            return None
+        wait = take(bucket_key(name, identity(request)), capacity, period)
+        if not wait:
+            return None
+        response = HttpResponse(
+            'Слишком много запросов, попробуйте позже',
+            status=429, content_type='text/plain; charset=utf-8'
+        )
+        response['Retry-After'] = str(wait)
+        return response
+
+
+class QueryLogMiddleware:
+    """Следит за SQL-запросами, выполненными при обработке запроса.
+
+    Медленные и повторяющиеся запросы пишутся в лог 'yatube.queries'
+    (python manage.py query_report). Счётчики запросов доступны
+    остальным middleware в request.queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.queries = QueryInspector(request)
+        with connection.execute_wrapper(request.queries):
+            return self.get_response(request)
+
+
+class ProfilerMiddleware:
+    """Профилирует представление для части запросов.
+
+    Под профилировщиком выполняется доля PROFILER_SAMPLE_RATE
+    запросов и запросы с подписанным заголовком PROFILER_HEADER
+    (python manage.py profile_report --token). Результаты разбирает
+    python manage.py profile_report. Должен стоять последним
+    в MIDDLEWARE, чтобы профилировать только само представление.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.should_profile(request):
+            return None
+        return profile_call(
+            request.resolver_match.view_name,
+            view_func, request, *view_args, **view_kwargs
+        )
+
+    @staticmethod
+    def should_profile(request):
+        token = request.META.get(
+            'HTTP_' + settings.PROFILER_HEADER.upper().replace('-', '_')
+        )
+        if token is not None:
+            return check_token(token)
+        return random.random() < settings.PROFILER_SAMPLE_RATE
@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class StoredFile(models.Model):
+    """Файл в хранилище с адресацией по содержимому.
+
+    refs - сколько объектов ссылается на файл; файл удаляется с диска,
+    когда счётчик доходит до нуля.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    size = models.PositiveIntegerField()
+    refs = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.refs})'
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо, ожидающее отправки фоновой задачей.
+
+    В message хранится сериализованный EmailMessage: так сохраняются
+    вложения, заголовки и альтернативные версии письма.
+    """
+    QUEUED = 'queued'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    subject = models.CharField(max_length=255)
+    recipients = models.TextField()
+    message = models.BinaryField()
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    send_after = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients}'
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'send_after'])]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(obj, field):
+    micros = (getattr(obj, field) - EPOCH) // MICROSECOND
+    return f'{micros}.{obj.pk}'
+
+
+def decode_cursor(cursor):
+    """Дата и pk из курсора; для испорченного курсора None."""
+    try:
+        micros, pk = map(int, cursor.split('.'))
+        date = EPOCH + micros * MICROSECOND
+    except (AttributeError, ValueError, OverflowError):
+        return None
+    return date, pk
+
+
+def keyset_page(queryset, cursor, size, field):
+    """Следующие size объектов после курсора в порядке убывания field.
+
+    В отличие от OFFSET, условие по (field, pk) использует индекс и
+    стоит одинаково на любой глубине ленты. Возвращает объекты и
+    курсор для следующей порции (None, если лента закончилась).
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        date, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': date}) | Q(**{field: date, 'pk__lt': pk})
+        )
+    objects = list(queryset[:size + 1])
+    if len(objects) <= size:
+        return objects, None
+    objects = objects[:size]
+    return objects, encode_cursor(objects[-1], field)
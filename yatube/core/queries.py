@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger('yatube.queries')
+
+STRINGS = re.compile(r"'(?:[^']|'')*'")
+NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACES = re.compile(r'\s+')
+# Кадры самого core (middleware, кэш, отрисовка) не ищем: нужен
+# код приложения, из которого пришёл запрос
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """SQL без значений: запросы, отличающиеся только ими, совпадают."""
+    sql = STRINGS.sub('?', sql)
+    sql = NUMBERS.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = PLACEHOLDER_LISTS.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def origin():
+    """Строка шаблона и место в коде проекта, откуда пришёл запрос."""
+    template = code = None
+    frame = sys._getframe(2)
+    while frame is not None and not (template and code):
+        node = frame.f_locals.get('self')
+        if template is None and isinstance(node, Node) and node.token:
+            template = f'{node.origin.template_name}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if code is None and filename.startswith(settings.BASE_DIR) \
+                and not filename.startswith(CORE_DIR) \
+                and 'site-packages' not in filename:
+            code = f'{os.path.relpath(filename, settings.BASE_DIR)}:' \
+                   f'{frame.f_lineno}'
+        frame = frame.f_back
+    return template, code
+
+
+class QueryInspector:
+    """Обёртка connection.execute_wrapper для одного запроса.
+
+    Пишет в лог 'yatube.queries' запросы дольше SLOW_QUERY_THRESHOLD
+    миллисекунд и шаблоны запросов, повторившиеся за запрос
+    REPEATED_QUERY_THRESHOLD раз (обычно ленивая загрузка в цикле).
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.duration = 0
+        self.patterns = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.duration += duration
+            pattern = fingerprint(sql)
+            self.patterns[pattern] += 1
+            if duration >= settings.SLOW_QUERY_THRESHOLD:
+                self.log('slow', pattern, duration)
+            if self.patterns[pattern] == settings.REPEATED_QUERY_THRESHOLD:
+                self.log('repeated', pattern, duration)
+
+    def log(self, kind, pattern, duration):
+        match = self.request.resolver_match
+        template, code = origin()
+        logger.warning('%s query in %s', kind, match and match.view_name,
+                       extra={'query': {
+                           'kind': kind,
+                           'view': match and match.view_name,
+                           'path': self.request.path,
+                           'fingerprint': pattern,
+                           'id': hashlib.md5(
+                               pattern.encode()
+                           ).hexdigest()[:12],
+                           'duration_ms': round(duration, 3),
+                           'template': template,
+                           'code': code,
+                       }})
@@ -0,0 +1,70 @@
+"""Ограничение частоты запросов корзинами токенов в общем кэше.
+
+Корзина вмещает capacity токенов и полностью наполняется за period
+секунд; каждый запрос берёт один токен. Корзина хранится одним целым
+числом - "теоретическим временем прибытия" (GCRA) в миллисекундах:
+моментом, когда она снова была бы полной. Запрос сдвигает его на
+period / capacity атомарным cache.incr, и если оно ушло дальше чем
+на period вперёд, токенов нет: сдвиг возвращается, а клиенту
+сообщается, сколько ждать. Ключ живёт, пока корзина не наполнится,
+поэтому пустой ключ означает полную корзину.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def bucket_key(name, identity):
+    return f'ratelimit:{name}:{identity}'
+
+
+def client_ip(request):
+    """IP-адрес клиента.
+
+    За прокси REMOTE_ADDR - адрес самого прокси, поэтому адрес клиента
+    берётся из заголовка RATE_LIMIT_IP_HEADER, который выставляет свой
+    прокси. В X-Forwarded-For доверять можно только последнему адресу:
+    его дописал свой прокси, остальные присылает клиент.
+    """
+    header = settings.RATE_LIMIT_IP_HEADER
+    value = header and request.META.get(header)
+    if value:
+        return value.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def identity(request):
+    """Чья корзина: вошедшего пользователя или IP-адреса гостя."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def take(key, capacity, period):
+    """Берёт токен из корзины key.
+
+    Возвращает 0, если токен взят, иначе сколько секунд ждать
+    следующего.
+    """
+    now = int(time.time() * 1000)
+    span = period * 1000
+    interval = span // capacity
+    # Полная корзина: из параллельных запросов ключ создаст один,
+    # остальные сдвинут время атомарно ниже
+    if cache.add(key, now + interval, math.ceil(interval / 1000)):
+        return 0
+    try:
+        arrival = cache.incr(key, interval)
+    except ValueError:
+        # Ключ истёк между add и incr: корзина уже полна
+        cache.add(key, now + interval, math.ceil(interval / 1000))
+        return 0
+    if arrival - now > span:
+        cache.decr(key, interval)
+        return math.ceil((arrival - span - now) / 1000)
+    # incr не продлевает срок ключа, а корзина должна дожить до
+    # момента, когда снова станет полной
+    cache.touch(key, max(math.ceil((arrival - now) / 1000), 1))
+    return 0
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Страница отдана из кэша без вызова представления
+page_cache_hit = Signal(providing_args=['request', 'url_name', 'kwargs'])
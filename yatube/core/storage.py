@@ -0,0 +1,88 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+from sorl.thumbnail import delete as delete_thumbnails
+from sorl.thumbnail.images import ImageFile
+
+from .images import forget_variants
+from .models import StoredFile
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла - хэш его содержимого.
+
+    Файл сохраняется как <upload_to>/ab/cd/abcd...<ext>. Одинаковые
+    загрузки дают одно имя, поэтому на диске и в кэше миниатюр sorl
+    остаётся одна копия; ссылки на неё считаются в StoredFile.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя зависит только от содержимого и выбирается в _save
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        incoming = self.path('.incoming')
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # Хэш считается, пока загрузка пишется во временный файл
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as tmp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+        digest = digest.hexdigest()
+        name = posixpath.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        )
+        with transaction.atomic():
+            _, created = StoredFile.objects.select_for_update(
+            ).get_or_create(name=name, defaults={'size': size, 'refs': 1})
+            if not created:
+                StoredFile.objects.filter(pk=name).update(refs=F('refs') + 1)
+        if self.exists(name):
+            os.remove(tmp.name)
+        else:
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp.name, path)
+            if settings.FILE_UPLOAD_PERMISSIONS is not None:
+                os.chmod(path, settings.FILE_UPLOAD_PERMISSIONS)
+        return name
+
+    def delete(self, name):
+        """Снимает одну ссылку; файл и миниатюры удаляются с последней."""
+        with transaction.atomic():
+            stored = StoredFile.objects.select_for_update().filter(
+                pk=name
+            ).first()
+            if stored is not None and stored.refs > 1:
+                StoredFile.objects.filter(pk=name).update(
+                    refs=F('refs') - 1
+                )
+                return
+            if stored is not None:
+                stored.delete()
+        try:
+            self.path(name)
+        except SuspiciousFileOperation:
+            # Имя указывает за пределы хранилища: файл не наш
+            return
+        if self.exists(name):
+            delete_thumbnails(ImageFile(name, storage=self), delete_file=False)
+            forget_variants(name)
+        super().delete(name)
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+# Место в шаблоне страницы, куда при потоковой отрисовке
+# дописываются элементы списка
+STREAM_MARKER = '<!--stream-->'
+
+
+def streaming_enabled(request):
+    match = request.resolver_match
+    return (
+        match is not None
+        and match.view_name in settings.STREAM_RENDER_VIEWS
+    )
+
+
+def render_streaming(request, template_name, context, items, item_template,
+                     items_name, **item_context):
+    """render(), отдающий длинный список порциями.
+
+    Для представлений из settings.STREAM_RENDER_VIEWS страница
+    рисуется с переменной streaming, при которой шаблон выводит
+    STREAM_MARKER вместо списка. Всё до маркера (head со стилями и
+    начало контента) уходит браузеру сразу, затем items по
+    STREAM_CHUNK_SIZE через item_template, затем остаток страницы.
+    Остальные представления рендерятся как обычно.
+    """
+    if not streaming_enabled(request):
+        return render(request, template_name, context)
+    page = render_to_string(
+        template_name, {**context, 'streaming': True}, request
+    )
+    head, _, tail = page.partition(STREAM_MARKER)
+
+    def render_chunk(chunk, continued):
+        return render_to_string(item_template, {
+            **item_context,
+            items_name: chunk,
+            'continued': continued,
+        }, request)
+
+    def chunks():
+        yield head
+        chunk, continued = [], False
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == settings.STREAM_CHUNK_SIZE:
+                yield render_chunk(chunk, continued)
+                chunk, continued = [], True
+        if chunk:
+            yield render_chunk(chunk, continued)
+        yield tail
+
+    return StreamingHttpResponse(chunks())
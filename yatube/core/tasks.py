@@ -0,0 +1,78 @@
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.utils import timezone
+
+from jobs.queue import enqueue, task
+from jobs.worker import backoff
+
+from .models import OutgoingEmail
+
+
+def schedule_delivery(delay=None):
+    return enqueue(
+        deliver_emails, delay=delay, idempotency_key='deliver_emails'
+    )
+
+
+@task(queue='mail')
+def deliver_emails():
+    """Отправляет накопившиеся письма пачками по EMAIL_BATCH_SIZE.
+
+    На каждую пачку открывается одно соединение. Неотправленные письма
+    откладываются с растущей задержкой, после EMAIL_MAX_ATTEMPTS
+    попыток помечаются ошибкой.
+    """
+    while True:
+        batch = list(OutgoingEmail.objects.filter(
+            status=OutgoingEmail.QUEUED, send_after__lte=timezone.now()
+        ).order_by('pk')[:settings.EMAIL_BATCH_SIZE])
+        if not batch:
+            break
+        send_batch(batch)
+    retry_at = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.QUEUED
+    ).order_by('send_after').values_list('send_after', flat=True).first()
+    if retry_at is not None:
+        delay = (retry_at - timezone.now()).total_seconds()
+        schedule_delivery(max(delay, 0))
+
+
+def send_batch(batch):
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            failed(email, error)
+        return
+    try:
+        for email in batch:
+            try:
+                connection.send_messages([pickle.loads(email.message)])
+            except Exception as error:
+                failed(email, error)
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status=OutgoingEmail.SENT, sent=timezone.now(),
+                    attempts=email.attempts + 1, last_error=''
+                )
+    finally:
+        connection.close()
+
+
+def failed(email, error):
+    attempts = email.attempts + 1
+    if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        changes = {'status': OutgoingEmail.FAILED}
+    else:
+        changes = {
+            'send_after': timezone.now() + timedelta(
+                seconds=backoff(attempts)
+            )
+        }
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        attempts=attempts, last_error=repr(error), **changes
+    )
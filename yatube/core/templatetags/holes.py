@@ -0,0 +1,13 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..holes import render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, *args):
+    """Выводит персональный фрагмент, который кэш страниц перерисует
+    для вошедшего пользователя (см. core.holes)."""
+    return mark_safe(render_hole(context['request'], name, list(args)))
@@ -0,0 +1,47 @@
+import logging
+
+from django import template
+from django.conf import settings
+from django.utils.html import format_html, format_html_join
+
+from ..images import MIME_TYPES, available_formats, cached_variants
+
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+
+def srcset(thumbnails):
+    return ', '.join(f'{url} {width}w' for url, width, _ in thumbnails)
+
+
+@register.simple_tag
+def responsive_image(image, sizes=None, css_class='card-img my-2'):
+    """<picture> с вариантами картинки разной ширины и формата.
+
+    Последний формат из RESPONSIVE_IMAGE_FORMATS идёт в <img> для
+    браузеров без поддержки остальных. width/height берутся из самого
+    широкого варианта, чтобы страница не прыгала при загрузке.
+    """
+    if not image:
+        return ''
+    try:
+        formats = cached_variants(image)
+    except Exception as error:
+        # Как и {% thumbnail %}, не роняем страницу из-за битого файла
+        logger.warning('Не удалось подготовить картинку %s: %s', image, error)
+        return ''
+    sizes = sizes or settings.RESPONSIVE_IMAGE_SIZES
+    *modern, fallback = available_formats()
+    url, width, height = formats[fallback][-1]
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[image_format], srcset(formats[image_format]), sizes)
+         for image_format in modern)
+    )
+    return format_html(
+        '<picture>{}<img class="{}" src="{}" srcset="{}" sizes="{}" '
+        'width="{}" height="{}" loading="lazy" alt=""></picture>',
+        sources, css_class, url, srcset(formats[fallback]), sizes,
+        width, height
+    )
@@ -0,0 +1,74 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..cache import get_or_compute
+
+
+class GetOrComputeTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def slow_compute(self):
+        self.calls += 1
+        time.sleep(0.2)
+        return self.calls
+
+    def run_concurrently(self, count=10):
+        results = []
+        barrier = threading.Barrier(count)
+
+        def request():
+            barrier.wait()
+            results.append(get_or_compute('feed', self.slow_compute, 60))
+        threads = [threading.Thread(target=request) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_misses_compute_once(self):
+        """Одновременные промахи пересчитывают значение один раз."""
+        results = self.run_concurrently()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1] * 10)
+
+    def test_stale_value_served_during_recompute(self):
+        """Пока один запрос пересчитывает, остальные получают старое."""
+        get_or_compute('feed', self.slow_compute, 60)
+        with mock.patch('core.cache.time.time', return_value=time.time() + 61):
+            results = self.run_concurrently()
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(sorted(results), [1] * 9 + [2])
+
+    def test_fresh_value_not_recomputed(self):
+        """Свежее значение берётся из кэша без вызова compute."""
+        get_or_compute('feed', lambda: 'value', 60)
+        compute = mock.Mock(return_value='new')
+        self.assertEqual(get_or_compute('feed', compute, 60), 'value')
+        compute.assert_not_called()
+
+    def test_early_refresh_near_expiry(self):
+        """Перед самым истечением значение пересчитывается заранее."""
+        get_or_compute('feed', self.slow_compute, 60)
+        with mock.patch('core.cache.random.random', return_value=1 - 1e-9), \
+                mock.patch('core.cache.time.time',
+                           return_value=time.time() + 59.9):
+            self.assertEqual(get_or_compute('feed', self.slow_compute, 60), 2)
+
+    def test_foreign_lock_not_released(self):
+        """Истёкшую и перехваченную другим блокировку пересчёт не снимает."""
+        def compute():
+            # Своя блокировка истекла, её взял другой запрос
+            cache.set('feed:lock', 'other', 10)
+            return 'value'
+        self.assertEqual(get_or_compute('feed', compute, 60), 'value')
+        self.assertEqual(cache.get('feed:lock'), 'other')
+        get_or_compute('fresh', lambda: 'value', 60)
+        self.assertIsNone(cache.get('fresh:lock'))
@@ -0,0 +1,98 @@
+import re
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from posts.models import Post
+
+from ..images import available_formats, variants
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def png(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (255, 0, 0)).save(buffer, 'PNG')
+    return SimpleUploadedFile('image.png', buffer.getvalue(), 'image/png')
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    RESPONSIVE_IMAGE_WIDTHS=(320, 640, 960),
+    RESPONSIVE_IMAGE_FORMATS=('WEBP', 'JPEG'),
+)
+class ResponsiveImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def render(self, post):
+        return Template(
+            '{% load images %}{% responsive_image post.image %}'
+        ).render(Context({'post': post}))
+
+    def test_dimensions_stored_on_upload(self):
+        """Размеры оригинала сохраняются в модели при загрузке."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=png(1200, 800)
+        )
+        self.assertEqual((post.image_width, post.image_height), (1200, 800))
+
+    def test_srcset_lists_all_widths_and_formats(self):
+        """Тег выводит все ширины в WebP и JPEG с размерами кадра."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=png(1200, 800)
+        )
+        html = self.render(post)
+        if 'WEBP' in available_formats():
+            self.assertIn('<source type="image/webp"', html)
+            self.assertEqual(re.findall(r'\.webp (\d+)w', html),
+                             ['320', '640', '960'])
+        self.assertEqual(re.findall(r'\.jpg (\d+)w', html),
+                         ['320', '640', '960'])
+        self.assertIn('width="960" height="339"', html)
+
+    def test_small_image_not_upscaled_into_many_variants(self):
+        """Для маленькой картинки остаётся только самый узкий вариант."""
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=png(400, 300)
+        )
+        html = self.render(post)
+        self.assertEqual(re.findall(r'\.jpg (\d+)w', html), ['320'])
+
+    def test_missing_file_renders_nothing(self):
+        """Битая ссылка на файл не ломает страницу."""
+        post = Post(text='Пост', author=self.user, image='posts/missing.png')
+        self.assertEqual(self.render(post), '')
+
+    def test_variants_cached_by_image_name(self):
+        """Повторная отрисовка картинки не обращается к sorl."""
+        cache.clear()
+        post = Post.objects.create(
+            text='Пост', author=self.user, image=png(700, 500)
+        )
+        html = self.render(post)
+        with mock.patch('core.images.variants', side_effect=variants) as call:
+            self.assertEqual(self.render(post), html)
+        call.assert_not_called()
+        post.image.storage.delete(post.image.name)
+        with mock.patch('core.images.variants', side_effect=variants) as call:
+            self.render(post)
+        call.assert_called_once()
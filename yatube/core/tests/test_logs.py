@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from ..logs import AsyncHandler, BatchingRotatingFileHandler, JsonFormatter
+
+
+def make_record(message):
+    return logging.makeLogRecord({'msg': message, 'levelno': logging.INFO})
+
+
+class LogHandlerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'app.log')
+
+    def read(self, filename=None):
+        with open(filename or self.filename) as log:
+            return log.read().splitlines()
+
+    def test_records_written_in_batches(self):
+        """Записи попадают в файл пачками по batch_size."""
+        handler = BatchingRotatingFileHandler(self.filename, batch_size=3)
+        self.addCleanup(handler.close)
+        handler.emit(make_record('первая'))
+        handler.emit(make_record('вторая'))
+        self.assertEqual(self.read(), [])
+        handler.emit(make_record('третья'))
+        self.assertEqual(self.read(), ['первая', 'вторая', 'третья'])
+
+    def test_rotation_by_size(self):
+        """Переполненный файл уходит в резервную копию."""
+        handler = BatchingRotatingFileHandler(
+            self.filename, batch_size=1, maxBytes=20, backupCount=2
+        )
+        self.addCleanup(handler.close)
+        for message in ('запись-1', 'запись-2', 'запись-3'):
+            handler.emit(make_record(message))
+        self.assertEqual(self.read(), ['запись-3'])
+        self.assertEqual(self.read(self.filename + '.1'), ['запись-2'])
+
+    def test_async_handler_writes_in_background(self):
+        """Очередь дописывается в файл при остановке."""
+        handler = AsyncHandler(
+            'core.logs.BatchingRotatingFileHandler',
+            filename=self.filename, batch_size=100
+        )
+        handler.setFormatter(JsonFormatter())
+        handler.handle(make_record('в очереди'))
+        handler.close()
+        self.assertEqual(
+            json.loads(self.read()[0])['message'], 'в очереди'
+        )
+
+
+class AccessLogTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_access_record(self):
+        """Запрос попадает в журнал со структурированными полями."""
+        with self.assertLogs('yatube.access') as logs:
+            response = self.client.get(reverse('posts:index'))
+        access = logs.records[0].access
+        self.assertEqual(access['url_name'], 'posts:index')
+        self.assertEqual(access['status'], 200)
+        self.assertIsNone(access['user_id'])
+        self.assertGreater(access['queries'], 0)
+        self.assertIn('log;dur=', response['Server-Timing'])
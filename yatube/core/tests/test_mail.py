@@ -0,0 +1,89 @@
+import socket
+
+from django.core.mail import send_mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+
+from ..mail import SMTPSink
+from ..models import OutgoingEmail
+from ..tasks import deliver_emails, schedule_delivery
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    QUEUED_EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_TIMEOUT=5,
+)
+class QueuedEmailTests(TestCase):
+
+    def setUp(self):
+        self.sink = SMTPSink().start()
+        self.addCleanup(self.sink.server_close)
+        self.addCleanup(self.sink.shutdown)
+
+    def send(self, count):
+        for number in range(count):
+            send_mail(f'Письмо {number}', 'Текст', 'from@yatube.ru',
+                      [f'user{number}@yatube.ru'])
+
+    def test_send_mail_only_queues(self):
+        """send_mail сохраняет письмо и ничего не отправляет."""
+        self.send(1)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, 'user0@yatube.ru')
+        self.assertEqual(email.status, OutgoingEmail.QUEUED)
+        self.assertEqual(self.sink.messages, [])
+
+    def test_batch_sent_over_one_connection(self):
+        """Пачка писем уходит через одно SMTP-соединение."""
+        self.send(3)
+        with self.settings(EMAIL_PORT=self.sink.server_address[1]):
+            deliver_emails()
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(len(self.sink.messages), 3)
+        self.assertEqual(self.sink.messages[0][1], ['user0@yatube.ru'])
+        self.assertEqual(
+            OutgoingEmail.objects.filter(status=OutgoingEmail.SENT).count(),
+            3
+        )
+
+    def test_failed_delivery_retried(self):
+        """Недоступный сервер: письмо откладывается, затем ошибка."""
+        self.send(1)
+        with self.settings(EMAIL_PORT=free_port(), EMAIL_MAX_ATTEMPTS=2):
+            deliver_emails()
+            email = OutgoingEmail.objects.get()
+            self.assertEqual(email.status, OutgoingEmail.QUEUED)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.send_after, timezone.now())
+            self.assertTrue(Job.objects.filter(
+                idempotency_key='deliver_emails', status=Job.QUEUED
+            ).exists())
+
+            OutgoingEmail.objects.update(send_after=timezone.now())
+            deliver_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertIn('ConnectionRefusedError', email.last_error)
+
+    def test_new_mail_not_delayed_by_retry(self):
+        """Новое письмо переносит отложенный повтор доставки на сейчас."""
+        self.send(1)
+        with self.settings(EMAIL_PORT=free_port()):
+            deliver_emails()
+        retry = Job.objects.get(idempotency_key='deliver_emails')
+        self.assertGreater(retry.run_at, timezone.now())
+        self.send(1)
+        job = schedule_delivery()
+        self.assertEqual(job.pk, retry.pk)
+        retry.refresh_from_db()
+        self.assertLessEqual(retry.run_at, timezone.now())
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.user)
+        self.url = reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        )
+
+    def test_anonymous_page_served_from_cache(self):
+        """Повторный анонимный запрос отдаётся из кэша."""
+        first = self.client.get(self.url)
+        self.assertFalse(first.has_header('X-Page-Cache'))
+        second = self.client.get(self.url)
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, first.content)
+
+    def test_query_params_are_part_of_key(self):
+        """Другая страница пагинации - другой ключ кэша."""
+        self.client.get(self.url)
+        response = self.client.get(self.url + '?page=2')
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        response = self.client.get(self.url + '?utm_source=mail')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_holes_filled_for_authenticated_user(self):
+        """Вошедший пользователь получает кэш со своими фрагментами."""
+        self.client.get(self.url)
+        response = self.authorized_user.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        html = response.content.decode()
+        self.assertIn('Пользователь: TestUser', html)
+        self.assertIn(
+            reverse('posts:profile_follow',
+                    kwargs={'username': self.author.username}),
+            html
+        )
+        self.assertNotIn(reverse('users:login'), html)
+
+    def test_new_post_invalidates_cache(self):
+        """Новый пост сбрасывает кэш страниц."""
+        self.client.get(self.url)
+        Post.objects.create(text='Свежий пост', author=self.author)
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'Свежий пост')
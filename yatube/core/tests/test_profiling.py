@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..profiling import make_token
+
+PROFILER_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    PROFILER_DIR=PROFILER_DIR, PROFILER_SAMPLE_RATE=0, PAGE_CACHE_VIEWS={}
+)
+class ProfilerTests(TestCase):
+
+    def tearDown(self):
+        shutil.rmtree(PROFILER_DIR, ignore_errors=True)
+
+    def saved(self, url_name='posts.index'):
+        path = os.path.join(PROFILER_DIR, url_name)
+        return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+    @override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_KEEP=2)
+    def test_sampled_requests_profiled_and_rotated(self):
+        """Профили сохраняются по имени представления, старые удаляются."""
+        for _ in range(3):
+            self.client.get(reverse('posts:index'))
+        files = self.saved()
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(name.endswith('.prof') for name in files))
+
+    def test_signed_header_enables_profiling(self):
+        """Только подписанный заголовок включает профилирование."""
+        self.client.get(reverse('posts:index'), HTTP_X_PROFILE='подделка')
+        self.assertEqual(self.saved(), [])
+        self.client.get(reverse('posts:index'), HTTP_X_PROFILE=make_token())
+        self.assertEqual(len(self.saved()), 1)
+
+    @override_settings(
+        PROFILER_SAMPLE_RATE=1, PROFILER_MODE='sampling',
+        PROFILER_SAMPLE_INTERVAL=0.001
+    )
+    def test_report_aggregates_profiles(self):
+        """profile_report выводит самые дорогие функции."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('about:author'))
+        with override_settings(PROFILER_MODE='cprofile'):
+            self.client.get(reverse('posts:index'))
+        output = StringIO()
+        call_command('profile_report', 'posts:index', '--top', '5',
+                     stdout=output)
+        report = output.getvalue()
+        self.assertIn('posts.index: 1 профилей cProfile', report)
+        self.assertIn('posts.index: 1 профилей по выборкам', report)
+        self.assertIn('function calls', report)
+        self.assertNotIn('about.author', report)
@@ -0,0 +1,106 @@
+import json
+import logging
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Origin, Template
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.urls import resolve, reverse
+
+from posts.models import Post
+
+from ..logs import JsonFormatter
+from ..queries import QueryInspector, fingerprint
+
+User = get_user_model()
+
+
+class FingerprintTests(SimpleTestCase):
+
+    def test_values_removed(self):
+        """Запросы с разными значениями дают один отпечаток."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT  *  FROM "t" WHERE "id" IN (%s)')
+        )
+        self.assertEqual(
+            fingerprint("SELECT 1 FROM t WHERE name = 'x' LIMIT 21"),
+            'SELECT ? FROM t WHERE name = ? LIMIT ?'
+        )
+
+
+@override_settings(PAGE_CACHE_VIEWS={}, REPEATED_QUERY_THRESHOLD=3)
+class QueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for i in range(5):
+            Post.objects.create(
+                text=f'Пост {i}',
+                author=User.objects.create_user(username=f'author{i}')
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def render_lazy_loads(self):
+        """Шаблон с ленивой загрузкой автора в цикле."""
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve('/')
+        template = Template(
+            '{% for post in posts %}\n{{ post.author.username }}{% endfor %}',
+            Origin('feed.html', template_name='feed.html')
+        )
+        with connection.execute_wrapper(QueryInspector(request)):
+            template.render(Context({'posts': Post.objects.all()}))
+
+    def test_repeated_query_attributed_to_template(self):
+        """Ленивая загрузка автора в цикле видна с местом в шаблоне."""
+        with self.assertLogs('yatube.queries') as logs:
+            self.render_lazy_loads()
+        queries = [record.query for record in logs.records]
+        repeated = [query for query in queries if query['kind'] == 'repeated']
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]['view'], 'posts:index')
+        self.assertIn('"auth_user"', repeated[0]['fingerprint'])
+        self.assertEqual(repeated[0]['template'], 'feed.html:2')
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_slow_queries_logged(self):
+        """Запросы дольше порога попадают в журнал."""
+        with self.assertLogs('yatube.queries') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertTrue(all(
+            record.query['duration_ms'] >= 0 for record in logs.records
+        ))
+        self.assertIn(
+            'slow', {record.query['kind'] for record in logs.records}
+        )
+
+    def test_query_report(self):
+        """query_report группирует записи журнала по отпечатку."""
+        with self.assertLogs('yatube.queries') as logs:
+            self.render_lazy_loads()
+        formatter = JsonFormatter()
+        with tempfile.NamedTemporaryFile('w', suffix='.log') as log:
+            for record in logs.records:
+                log.write(formatter.format(record) + '\n')
+            log.flush()
+            output = StringIO()
+            call_command('query_report', '--file', log.name, stdout=output)
+        report = output.getvalue()
+        self.assertIn('repeated x1', report)
+        self.assertIn('представление posts:index: 1', report)
+        self.assertIn('источник feed.html:2: 1', report)
+
+    def test_json_formatter_keeps_extra(self):
+        """JSON-запись содержит поля из extra."""
+        record = logging.makeLogRecord({'msg': 'текст', 'query': {'id': 1}})
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data['message'], 'текст')
+        self.assertEqual(data['query'], {'id': 1})
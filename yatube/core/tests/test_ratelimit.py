@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..ratelimit import take
+
+User = get_user_model()
+
+
+@override_settings(RATE_LIMITS={
+    'posts:create_post': (2, 60, ('POST',)),
+    'users:signup': (1, 60, ('GET', 'POST')),
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Flooder')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_limited_with_retry_after(self):
+        """Сверх лимита ответ 429 с Retry-After, показ формы не считается."""
+        url = reverse('posts:create_post')
+        for _ in range(2):
+            self.client.post(url, {'text': ''})
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'text': ''})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(
+            self.client.get(reverse('posts:index')).status_code, 200
+        )
+
+    def test_buckets_per_user_and_ip(self):
+        """У каждого пользователя и гостевого IP своя корзина."""
+        url = reverse('users:signup')
+        guest = Client()
+        self.assertEqual(guest.get(url).status_code, 200)
+        self.assertEqual(guest.get(url).status_code, 429)
+        self.assertEqual(
+            guest.get(url, REMOTE_ADDR='10.0.0.1').status_code, 200
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_client_ip_from_proxy_header(self):
+        """За прокси гости различаются по адресу, который дописал прокси."""
+        url = reverse('users:signup')
+        guest = Client(REMOTE_ADDR='10.0.0.100')
+        for address in ('1.1.1.1', '2.2.2.2'):
+            response = guest.get(
+                url, HTTP_X_FORWARDED_FOR=f'9.9.9.9, {address}'
+            )
+            self.assertEqual(response.status_code, 200)
+        response = guest.get(url, HTTP_X_FORWARDED_FOR='8.8.8.8, 1.1.1.1')
+        self.assertEqual(response.status_code, 429)
+
+    def test_tokens_refill(self):
+        """Токены возвращаются со временем, отказы их не тратят."""
+        with mock.patch('time.time', return_value=1000):
+            self.assertEqual(take('bucket', 2, 60), 0)
+            self.assertEqual(take('bucket', 2, 60), 0)
+            for _ in range(3):
+                self.assertEqual(take('bucket', 2, 60), 30)
+        with mock.patch('time.time', return_value=1030):
+            self.assertEqual(take('bucket', 2, 60), 0)
+            self.assertEqual(take('bucket', 2, 60), 30)
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from ..models import StoredFile
+from ..storage import ContentAddressedStorage
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+
+    def test_same_content_stored_once(self):
+        """Одинаковые загрузки получают одно имя и один файл."""
+        first = self.storage.save('posts/cat.gif', ContentFile(b'meme'))
+        second = self.storage.save('posts/copy.GIF', ContentFile(b'meme'))
+        other = self.storage.save('posts/dog.gif', ContentFile(b'other'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/'
+                                r'[0-9a-f]{64}\.gif$')
+        self.assertEqual(StoredFile.objects.get(pk=first).refs, 2)
+        self.assertEqual(os.listdir(self.storage.path('.incoming')), [])
+
+    def test_file_removed_with_last_reference(self):
+        """Файл удаляется с диска только после снятия всех ссылок."""
+        name = self.storage.save('posts/cat.gif', ContentFile(b'meme'))
+        self.storage.save('posts/cat.gif', ContentFile(b'meme'))
+
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(pk=name).exists())
@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    STREAM_RENDER_VIEWS=('posts:post_detail', 'posts:index'),
+    STREAM_CHUNK_SIZE=10,
+    PAGE_CACHE_VIEWS={}
+)
+class StreamingRenderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author, text=f'Коммент {i}')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_head_sent_before_comments(self):
+        """Первая порция - начало страницы с постом, дальше комментарии."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 5)
+        self.assertIn('bootstrap.min.css', chunks[0])
+        self.assertIn('Тестовый пост', chunks[0])
+        self.assertNotIn('Коммент', chunks[0])
+        self.assertIn('</html>', chunks[-1])
+        page = ''.join(chunks)
+        for i in range(25):
+            self.assertIn(f'<p>Коммент {i}</p>', page)
+
+    def test_feed_cards_streamed(self):
+        """Карточки ленты дописываются в ту же разметку."""
+        response = self.client.get(reverse('posts:index'))
+        page = b''.join(response.streaming_content).decode()
+        self.assertEqual(page.count('<article>'), 1)
+        self.assertNotIn('<!--stream-->', page)
+
+    @override_settings(STREAM_RENDER_VIEWS=())
+    def test_regular_render_by_default(self):
+        """Без включения в настройках страница рендерится как обычно."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.context['comments']), 10)
@@ -1,10 +1,44 @@
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponseNotFound
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+from .holes import fill_holes
+
+# Страница 404 для анонимов рендерится один раз на процесс и год
+# (он выводится в подвале), дальше в неё подставляется только адрес
+PATH_PLACEHOLDER = '__not_found_path__'
+not_found_page = (None, '')
+
+
+def blank_request():
+    """Запрос без адреса и пользователя: в заготовку 404 не должно
+    попасть ничего от запроса, который её вызвал."""
+    request = HttpRequest()
+    request.user = AnonymousUser()
+    return request
 
 
 def page_not_found(request, exception):
     # Переменная exception содержит отладочную информацию,
     # выводить её в шаблон пользователской страницы 404 мы не станем
-    return render(request, 'core/404.html', {'path': request.path}, status=404)
+    global not_found_page
+    if request.user.is_authenticated:
+        return render(
+            request, 'core/404.html', {'path': request.path}, status=404
+        )
+    year = timezone.now().year
+    if not_found_page[0] != year:
+        not_found_page = (year, render_to_string(
+            'core/404.html', {'path': PATH_PLACEHOLDER}, blank_request()
+        ))
+    # Шапка с навигацией - дырка, она рисуется для этого запроса
+    return HttpResponseNotFound(fill_holes(
+        not_found_page[1].replace(PATH_PLACEHOLDER, escape(request.path)),
+        request
+    ))
 
 
 def permission_denied(request, exception):
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'queue', 'priority', 'status',
+                    'attempts', 'run_at', 'finished')
+    list_filter = ('status', 'queue')
+    search_fields = ('task', 'idempotency_key')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркер фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue', action='append', dest='queues',
+            help='Обрабатывать только указанные очереди'
+        )
+        parser.add_argument(
+            '--threads', type=int,
+            help='Размер пула потоков (0 - выполнять в основном потоке)'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить доступные задачи и выйти'
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(queues=options['queues'], threads=options['threads'])
+        if options['once']:
+            worker.requeue_stale()
+            count = worker.run_once()
+            if worker.executor is not None:
+                worker.executor.shutdown(wait=True)
+            self.stdout.write(f'Выполнено задач: {count}')
+            return
+        self.stdout.write(
+            'Воркер запущен, очереди: ' + ', '.join(worker.limits)
+        )
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            self.stdout.write('Воркер остановлен')
@@ -0,0 +1,55 @@
+from django.db import models
+from django.db.models import Q
+from django.db.models.constraints import UniqueConstraint
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField(max_length=200)
+    queue = models.CharField(max_length=50, default='default')
+    payload = models.TextField(default='{}')
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    idempotency_key = models.CharField(max_length=200, blank=True, null=True)
+    run_at = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.task} [{self.status}]'
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'queue', 'run_at']),
+        ]
+        constraints = [
+            # Ключ идемпотентности уникален среди ожидающих задач:
+            # повторная постановка сливается с уже стоящей в очереди
+            UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=Q(status='queued'),
+                name='unique_queued_idempotency_key'
+            ),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
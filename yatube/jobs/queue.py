@@ -0,0 +1,67 @@
+import json
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+def task(queue='default', max_attempts=3):
+    """Регистрирует функцию как фоновую задачу.
+
+    Аргументы задачи должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__name__}'
+        func.queue = queue
+        func.max_attempts = max_attempts
+        registry[func.task_name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, args=(), kwargs=None, *, queue=None, priority=0,
+            idempotency_key=None, delay=None, max_attempts=None):
+    """Ставит задачу в очередь и сразу возвращает объект Job.
+
+    Если в очереди уже ждёт задача с тем же idempotency_key,
+    новая не создаётся и возвращается существующая; если та
+    запланирована позже, её запуск переносится на запрошенное время.
+    """
+    if isinstance(func, str):
+        func = registry[func]
+    run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    if idempotency_key:
+        job = Job.objects.filter(
+            idempotency_key=idempotency_key, status=Job.QUEUED
+        ).first()
+        if job is not None:
+            # Например, свежее письмо не ждёт отложенного повтора
+            if job.run_at > run_at and Job.objects.filter(
+                pk=job.pk, status=Job.QUEUED, run_at__gt=run_at
+            ).update(run_at=run_at):
+                job.run_at = run_at
+            return job
+    job = Job(
+        task=func.task_name,
+        queue=queue or func.queue,
+        payload=json.dumps({'args': list(args), 'kwargs': kwargs or {}}),
+        priority=priority,
+        max_attempts=max_attempts or func.max_attempts,
+        idempotency_key=idempotency_key,
+        run_at=run_at,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        # Параллельный запрос успел поставить задачу с тем же ключом
+        return Job.objects.get(
+            idempotency_key=idempotency_key, status=Job.QUEUED
+        )
+    return job
@@ -0,0 +1,73 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Job
+from ..queue import enqueue, task
+from ..worker import Worker
+
+calls = []
+
+
+@task()
+def remember(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise ValueError('Ошибка в задаче')
+
+
+@override_settings(JOBS_QUEUES={'default': 10}, JOBS_RETRY_DELAY=30)
+class WorkerTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(threads=0)
+
+    def test_job_runs_and_finishes(self):
+        """Задача выполняется воркером и помечается выполненной."""
+        job = enqueue(remember, ('пост',))
+        self.assertEqual(self.worker.run_once(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(calls, ['пост'])
+
+    def test_jobs_run_by_priority(self):
+        """Задачи с большим приоритетом выполняются первыми."""
+        enqueue(remember, ('обычная',))
+        enqueue(remember, ('срочная',), priority=10)
+        self.worker.run_once()
+        self.assertEqual(calls, ['срочная', 'обычная'])
+
+    def test_idempotency_key_merges_queued_jobs(self):
+        """Повторная постановка с тем же ключом не создаёт новую задачу."""
+        first = enqueue(remember, (1,), idempotency_key='key')
+        second = enqueue(remember, (1,), idempotency_key='key')
+        self.assertEqual(first.pk, second.pk)
+        self.worker.run_once()
+        third = enqueue(remember, (1,), idempotency_key='key')
+        self.assertNotEqual(first.pk, third.pk)
+
+    def test_failed_job_retried_with_backoff(self):
+        """Упавшая задача откладывается, а после max_attempts - ошибка."""
+        job = enqueue(explode)
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('ValueError', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_QUEUES={'default': 1})
+    def test_queue_concurrency_limit(self):
+        """Воркер не берёт задач больше лимита очереди."""
+        enqueue(remember, (1,))
+        enqueue(remember, (2,))
+        Job.objects.create(task=remember.task_name, status=Job.RUNNING)
+        self.assertEqual(Worker(threads=0).run_once(), 0)
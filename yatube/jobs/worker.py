@@ -0,0 +1,133 @@
+import json
+import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import registry
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(attempts):
+    """Задержка перед повторным запуском: растёт экспоненциально."""
+    return settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+class Worker:
+    """Забирает задачи из БД и выполняет их в пуле потоков.
+
+    Лимит одновременно выполняемых задач задаётся для каждой очереди
+    в settings.JOBS_QUEUES и считается по всем запущенным воркерам.
+    При threads=0 задачи выполняются в текущем потоке.
+    """
+
+    def __init__(self, queues=None, threads=None):
+        self.limits = {
+            name: limit for name, limit in settings.JOBS_QUEUES.items()
+            if queues is None or name in queues
+        }
+        if threads is None:
+            threads = sum(self.limits.values())
+        self.executor = ThreadPoolExecutor(threads) if threads else None
+
+    def requeue_stale(self):
+        """Возвращает в очередь задачи, воркер которых, видимо, упал."""
+        deadline = timezone.now() - timedelta(
+            seconds=settings.JOBS_STALE_TIMEOUT
+        )
+        stale = Job.objects.filter(status=Job.RUNNING, started__lt=deadline)
+        for job in stale:
+            self.retry(job, 'Превышено время выполнения')
+
+    def claim(self, queue, limit):
+        now = timezone.now()
+        with transaction.atomic():
+            running = Job.objects.filter(
+                queue=queue, status=Job.RUNNING
+            ).count()
+            free = limit - running
+            if free <= 0:
+                return []
+            candidates = Job.objects.filter(
+                queue=queue, status=Job.QUEUED, run_at__lte=now
+            ).values_list('pk', flat=True)[:free]
+            claimed = []
+            for pk in candidates:
+                # Условный UPDATE не даст двум воркерам взять одну задачу
+                taken = Job.objects.filter(
+                    pk=pk, status=Job.QUEUED
+                ).update(
+                    status=Job.RUNNING,
+                    started=now,
+                    attempts=F('attempts') + 1
+                )
+                if taken:
+                    claimed.append(pk)
+        return list(Job.objects.filter(pk__in=claimed))
+
+    def run_once(self):
+        """Забирает все доступные задачи; возвращает их количество."""
+        jobs = []
+        for queue, limit in self.limits.items():
+            jobs.extend(self.claim(queue, limit))
+        for job in jobs:
+            if self.executor is None:
+                self.execute(job)
+            else:
+                self.executor.submit(self.execute, job)
+        return len(jobs)
+
+    def run(self, poll_interval=None):
+        poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        try:
+            while True:
+                self.requeue_stale()
+                if not self.run_once():
+                    time.sleep(poll_interval)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+
+    def execute(self, job):
+        close_old_connections()
+        try:
+            func = registry[job.task]
+            payload = json.loads(job.payload)
+            func(*payload['args'], **payload['kwargs'])
+        except Exception:
+            logger.exception('Задача %s (%s) завершилась ошибкой',
+                             job.pk, job.task)
+            self.retry(job, traceback.format_exc())
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.DONE, finished=timezone.now(), last_error=''
+            )
+        finally:
+            close_old_connections()
+
+    def retry(self, job, error):
+        job.refresh_from_db(fields=['attempts'])
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, finished=timezone.now(), last_error=error
+            )
+            return
+        run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+        try:
+            with transaction.atomic():
+                Job.objects.filter(pk=job.pk).update(
+                    status=Job.QUEUED, run_at=run_at, last_error=error
+                )
+        except IntegrityError:
+            # Такая же задача уже ждёт в очереди: повтор не нужен
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, finished=timezone.now(), last_error=error
+            )
@@ -1,17 +1,66 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
-from .models import Comment, Follow, Group, Post
+from jobs.queue import enqueue
+
+from .models import Comment, DeletedUser, Follow, Group, Post, Tag
+from .purge import hide_groups, hide_users
+from .tasks import purge_group, purge_user
+
+User = get_user_model()
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'is_duplicate')
     empty_value_display = '-пусто-'
 
 
+class SoftDeleteAdmin(admin.ModelAdmin):
+    """Удаление из админки только скрывает объекты.
+
+    Связанные записи удаляет фоновая задача purge порциями, поэтому
+    каскад не собирается ни здесь, ни на странице подтверждения.
+    """
+    hide = purge = None
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        for pk in self.hide(queryset):
+            enqueue(self.purge, (pk,),
+                    idempotency_key=f'{self.purge.__name__}:{pk}')
+
+
+class GroupAdmin(SoftDeleteAdmin):
+    list_display = ('pk', 'title', 'slug', 'is_deleted')
+    list_filter = ('is_deleted',)
+    hide = staticmethod(hide_groups)
+    purge = staticmethod(purge_group)
+
+
+class SoftDeleteUserAdmin(SoftDeleteAdmin, UserAdmin):
+    hide = staticmethod(hide_users)
+    purge = staticmethod(purge_user)
+
+
+class DeletedUserAdmin(admin.ModelAdmin):
+    """Удаление пометки восстанавливает ещё не очищенного пользователя."""
+    list_display = ('user', 'deleted_at')
+
+
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.register(Tag)
+admin.site.register(DeletedUser, DeletedUserAdmin)
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .notifications import unread_count
+
+
+def notifications(request):
+    """Число непрочитанных уведомлений; запрос к БД - только если
+    шаблон выводит значение."""
+    def count():
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return 0
+        return unread_count(user)
+    return {'unread_notifications': SimpleLazyObject(count)}
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# SQLite ограничивает число параметров в одном запросе
+FLUSH_BATCH_SIZE = 400
+# Как часто фоновый поток проверяет, не пора ли записать буфер
+TICK = 1
+
+
+class ViewCounter:
+    """Буфер просмотров постов внутри процесса.
+
+    Просмотры копятся в памяти, а фоновый поток раз
+    в POST_VIEWS_FLUSH_INTERVAL секунд записывает их одним
+    UPDATE ... CASE, так что число записей в БД зависит от интервала,
+    а не от посещаемости, и запрос страницы БД не трогает. При
+    остановке процесса теряются просмотры не более чем за один интервал.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.last_flush = time.monotonic()
+        self.thread = None
+
+    def hit(self, post_id):
+        with self.lock:
+            self.pending[post_id] += 1
+            if self.thread is None:
+                # Поток запускается при первом просмотре, а не при
+                # импорте: management-командам он не нужен
+                self.thread = threading.Thread(
+                    target=self.run, name='view-counter', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(TICK)
+            self.flush_due()
+
+    def flush_due(self):
+        """Записывает буфер, если прошёл интервал; ошибки БД только в лог."""
+        if (time.monotonic() - self.last_flush
+                < settings.POST_VIEWS_FLUSH_INTERVAL):
+            return
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Не удалось записать просмотры постов')
+        finally:
+            close_old_connections()
+
+    def pending_for(self, post_id):
+        return self.pending.get(post_id, 0)
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.last_flush = time.monotonic()
+        items = list(pending.items())
+        written = 0
+        try:
+            for written in range(0, len(items), FLUSH_BATCH_SIZE):
+                self.write(items[written:written + FLUSH_BATCH_SIZE])
+        except Exception:
+            # Не теряем просмотры, если БД была занята: незаписанные
+            # пачки запишем в следующий раз, записанные уже в БД
+            with self.lock:
+                self.pending.update(dict(items[written:]))
+            raise
+        return len(items)
+
+    def write(self, items):
+        # Посты с одинаковым приростом объединяются в одну ветку CASE
+        by_increment = defaultdict(list)
+        for post_id, increment in items:
+            by_increment[increment].append(post_id)
+        Post.objects.filter(pk__in=[post_id for post_id, _ in items]).update(
+            views=F('views') + Case(
+                *(When(pk__in=ids, then=Value(increment))
+                  for increment, ids in by_increment.items()),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+
+
+view_counter = ViewCounter()
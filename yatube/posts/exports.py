@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import zipfile
+
+from django.conf import settings
+
+from .models import Comment, Post
+
+CSV_HEADER = ('type', 'id', 'post_id', 'group', 'date', 'image', 'text')
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+class ZipStream:
+    """Файл без seek для zipfile: копит записанные байты до выдачи."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_records(author, chunk_size=None):
+    """Посты и комментарии автора по одному словарю за раз.
+
+    Строки читаются из БД через iterator() порциями по chunk_size,
+    поэтому память не зависит от количества записей.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    posts = Post.objects.filter(author=author).order_by('pk').values_list(
+        'pk', 'group__slug', 'pub_date', 'image', 'text'
+    )
+    for pk, group, pub_date, image, text in posts.iterator(chunk_size):
+        yield {
+            'type': 'post',
+            'id': pk,
+            'group': group,
+            'date': pub_date.isoformat(),
+            'image': image,
+            'text': text,
+        }
+    comments = Comment.objects.filter(
+        author=author
+    ).order_by('pk').values_list('pk', 'post_id', 'created', 'text')
+    for pk, post_id, created, text in comments.iterator(chunk_size):
+        yield {
+            'type': 'comment',
+            'id': pk,
+            'post_id': post_id,
+            'date': created.isoformat(),
+            'text': text,
+        }
+
+
+def iter_ndjson(author, chunk_size=None):
+    for record in iter_records(author, chunk_size):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def iter_csv(author, chunk_size=None):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for record in iter_records(author, chunk_size):
+        yield writer.writerow(record.get(column) for column in CSV_HEADER)
+
+
+def iter_zip(author, chunk_size=None):
+    """Zip-архив с posts.ndjson и картинками, собираемый на лету."""
+    stream = ZipStream()
+    storage = Post._meta.get_field('image').storage
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('posts.ndjson', 'w', force_zip64=True) as entry:
+            for line in iter_ndjson(author, chunk_size):
+                entry.write(line.encode())
+                yield stream.pop()
+        # Одна картинка может быть у нескольких постов, а имя в архиве
+        # должно встречаться один раз
+        images = Post.objects.filter(author=author).exclude(
+            image=''
+        ).order_by('image').values_list('image', flat=True).distinct()
+        for name in images.iterator(chunk_size or settings.EXPORT_CHUNK_SIZE):
+            if not storage.exists(name):
+                continue
+            # Картинки уже сжаты: складываем их без компрессии
+            info = zipfile.ZipInfo(
+                os.path.join('images', name),
+                date_time=storage.get_modified_time(name).timetuple()[:6]
+            )
+            with storage.open(name) as image, \
+                    archive.open(info, 'w', force_zip64=True) as entry:
+                for chunk in image.chunks():
+                    entry.write(chunk)
+                    yield stream.pop()
+    yield stream.pop()
+
+
+FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson; charset=utf-8'),
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'zip': (iter_zip, 'application/zip'),
+}
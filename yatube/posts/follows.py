@@ -0,0 +1,55 @@
+"""Кэш подписок пользователя для проверок "подписан ли" без запросов.
+
+Подписки хранятся в кэше как отсортированный кортеж id авторов под
+ключом follows:<user_id>, поэтому после первого чтения проверка -
+двоичный поиск в памяти. В пределах запроса кортеж читается из кэша
+один раз, сколько бы карточек его ни проверяло. Подписка и отписка
+удаляют ключ, а не правят кортеж: параллельные изменения не теряются,
+и следующее чтение берёт набор из БД. Короткий FOLLOW_SET_TIMEOUT
+ограничивает срок, если чтение из БД разминулось с удалением ключа.
+"""
+import bisect
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+
+def follows_key(user_id):
+    return f'follows:{user_id}'
+
+
+def author_ids(user_id):
+    """Отсортированные id авторов, на которых подписан пользователь."""
+    ids = cache.get(follows_key(user_id))
+    if ids is None:
+        ids = tuple(Follow.objects.filter(user_id=user_id).order_by(
+            'author_id'
+        ).values_list('author_id', flat=True))
+        cache.set(follows_key(user_id), ids, settings.FOLLOW_SET_TIMEOUT)
+    return ids
+
+
+def for_request(request):
+    """Подписки текущего пользователя, прочитанные раз за запрос."""
+    if not request.user.is_authenticated:
+        return ()
+    if not hasattr(request, 'follow_ids'):
+        request.follow_ids = author_ids(request.user.pk)
+    return request.follow_ids
+
+
+def contains(ids, author_id):
+    position = bisect.bisect_left(ids, author_id)
+    return position < len(ids) and ids[position] == author_id
+
+
+def digest(request):
+    """Короткий отпечаток подписок для ETag персональных фрагментов."""
+    return hash(for_request(request))
+
+
+def forget(user_ids):
+    """Сбрасывает кэш подписок пользователей после их изменения."""
+    cache.delete_many([follows_key(user_id) for user_id in user_ids])
@@ -1,9 +1,30 @@
 from django import forms
+from django.conf import settings
 
-from .models import Comment, Post
+from . import minhash
+from .models import Comment, Group, Post
 
 
 class PostForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['group'].queryset = Group.objects.filter(
+            is_deleted=False
+        )
+
+    def clean_text(self):
+        """Отклоняет или помечает почти дословные повторы других постов."""
+        text = self.cleaned_data['text']
+        duplicates = minhash.near_duplicates(
+            minhash.signature(text), exclude=self.instance.pk
+        )
+        if duplicates and settings.DUPLICATE_POST_ACTION == 'reject':
+            raise forms.ValidationError(
+                'Почти такой же пост уже опубликован'
+            )
+        self.instance.is_duplicate = bool(duplicates)
+        return text
+
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
@@ -0,0 +1,62 @@
+from django.conf import settings
+
+from core.holes import hole
+
+from . import follows
+from .forms import CommentForm
+from .lookups import get_user_id_or_404
+from .models import FollowSuggestion
+
+
+@hole('posts.switcher', 'posts/includes/switcher.html')
+def switcher(request, active):
+    return {active: True}
+
+
+@hole('posts.profile_actions', 'posts/includes/profile_actions.html')
+def profile_actions(request, username):
+    return {
+        'username': username,
+        'following': follows.contains(
+            follows.for_request(request), get_user_id_or_404(username)
+        ),
+        'is_owner': request.user.username == username,
+    }
+
+
+@hole('posts.follow_button', 'posts/includes/follow_button.html')
+def follow_button(request, author_id, username):
+    """Кнопка подписки на карточке поста; все карточки страницы
+    проверяются по одному закэшированному набору подписок."""
+    user = request.user
+    return {
+        'username': username,
+        'show': user.is_authenticated and user.pk != author_id,
+        'following': follows.contains(follows.for_request(request), author_id),
+    }
+
+
+@hole('posts.edit_link', 'posts/includes/edit_link.html')
+def edit_link(request, post_id, username):
+    return {
+        'post_id': post_id,
+        'can_edit': request.user.username == username,
+    }
+
+
+@hole('posts.comment_form', 'posts/includes/comment_form.html')
+def comment_form(request, post_id):
+    return {'post_id': post_id, 'form': CommentForm()}
+
+
+@hole('posts.suggestions', 'posts/includes/suggestions.html')
+def suggestions(request):
+    user = request.user
+    if not user.is_authenticated:
+        return {}
+    # Подписки, сделанные после пересчёта, отсеиваются в том же запросе
+    return {'suggestions': FollowSuggestion.objects.filter(
+        user=user, author__is_active=True, author__deletion__isnull=True
+    ).exclude(
+        author__following__user=user
+    ).select_related('author')[:settings.SUGGESTIONS_SHOWN]}
@@ -0,0 +1,317 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.images import get_image_dimensions
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import bump_content_version
+from core.models import StoredFile
+
+from . import follows, markup, minhash, tags, trending
+from .forms import CommentForm, PostForm
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Поля форм создаются один раз и проверяют каждую строку без
+# создания экземпляра формы
+POST_TEXT = PostForm.base_fields['text']
+COMMENT_TEXT = CommentForm.base_fields['text']
+GROUP_TITLE = Group._meta.get_field('title').formfield()
+GROUP_SLUG = Group._meta.get_field('slug').formfield()
+
+
+class RowError(Exception):
+    pass
+
+
+def clean(field, value):
+    try:
+        return field.clean(value)
+    except ValidationError as error:
+        raise RowError('; '.join(error.messages))
+
+
+@contextmanager
+def preserve_dates(*fields):
+    """Отключает auto_now_add, чтобы сохранить даты из выгрузки."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    """Загружает группы, посты, комментарии и подписки из NDJSON.
+
+    Строки копятся в пачки по batch_size и пишутся bulk_create,
+    каждая пачка в своей транзакции. Авторы, группы и посты
+    сопоставляются с id через словари в памяти.
+    """
+
+    def __init__(self, batch_size=1000, create_users=False,
+                 default_author=None):
+        self.batch_size = batch_size
+        self.create_users = create_users
+        self.default_author = default_author
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.images = {}
+        self.pending = {'group': [], 'post': [], 'comment': [], 'follow': []}
+        self.counts = Counter()
+        self.errors = []
+
+    def run(self, lines):
+        started = time.monotonic()
+        fields = (Post._meta.get_field('pub_date'),
+                  Comment._meta.get_field('created'))
+        with preserve_dates(*fields):
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    self.pending[row['type']].append((number, row))
+                except (ValueError, KeyError, TypeError):
+                    self.errors.append((number, 'Некорректная строка'))
+                    continue
+                if sum(map(len, self.pending.values())) >= self.batch_size:
+                    self.flush()
+            self.flush()
+        return time.monotonic() - started
+
+    def flush(self):
+        for kind in ('group', 'post', 'comment', 'follow'):
+            rows, self.pending[kind] = self.pending[kind], []
+            if rows:
+                getattr(self, f'import_{kind}s')(rows)
+
+    def build(self, rows, make):
+        objects, keys = [], []
+        for number, row in rows:
+            try:
+                objects.append(make(row))
+                keys.append(row.get('id'))
+            except RowError as error:
+                self.errors.append((number, str(error)))
+        return objects, keys
+
+    def resolve_users(self, usernames):
+        missing = {
+            name for name in usernames if name and name not in self.users
+        }
+        if not missing:
+            return
+        self.users.update(User.objects.filter(
+            username__in=missing
+        ).values_list('username', 'pk'))
+        missing -= set(self.users)
+        if missing and self.create_users:
+            new_users = []
+            for name in missing:
+                user = User(username=name)
+                user.set_unusable_password()
+                new_users.append(user)
+            with transaction.atomic():
+                User.objects.bulk_create(new_users)
+            self.users.update(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+            self.counts['user'] += len(new_users)
+
+    def resolve_groups(self, slugs):
+        missing = {slug for slug in slugs if slug not in self.groups}
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing
+            ).values_list('slug', 'pk'))
+
+    def resolve_images(self, names):
+        """Размеры картинок, уже лежащих в хранилище постов.
+
+        Принимаются только файлы с записью StoredFile: на остальные
+        импортированный пост не сможет взять ссылку.
+        """
+        missing = {name for name in names if name not in self.images}
+        if not missing:
+            return
+        storage = Post._meta.get_field('image').storage
+        owned = set(StoredFile.objects.filter(
+            pk__in=missing
+        ).values_list('pk', flat=True))
+        for name in missing:
+            size = None
+            if name in owned and storage.exists(name):
+                with storage.open(name) as file:
+                    size = get_image_dimensions(file)
+            self.images[name] = size
+
+    def image_size(self, name):
+        size = self.images.get(name)
+        if size is None or None in size:
+            raise RowError(f'Неизвестная картинка {name}')
+        return size
+
+    def author_id(self, row, key='author'):
+        name = row.get(key) or self.default_author
+        if name not in self.users:
+            raise RowError(f'Неизвестный пользователь {name}')
+        return self.users[name]
+
+    def import_groups(self, rows):
+        self.resolve_groups(row.get('slug') for _, row in rows)
+        seen = set()
+
+        def make(row):
+            slug = clean(GROUP_SLUG, row.get('slug'))
+            if slug in self.groups or slug in seen:
+                raise RowError(f'Группа {slug} уже существует')
+            seen.add(slug)
+            return Group(
+                slug=slug,
+                title=clean(GROUP_TITLE, row.get('title')),
+                description=row.get('description', '')
+            )
+        groups, _ = self.build(rows, make)
+        with transaction.atomic():
+            Group.objects.bulk_create(groups)
+        self.groups.update(Group.objects.filter(
+            slug__in=[group.slug for group in groups]
+        ).values_list('slug', 'pk'))
+        self.counts['group'] += len(groups)
+
+    def import_posts(self, rows):
+        self.resolve_users(
+            row.get('author') or self.default_author for _, row in rows
+        )
+        self.resolve_groups(
+            row['group'] for _, row in rows if row.get('group')
+        )
+        self.resolve_images(
+            row['image'] for _, row in rows if row.get('image')
+        )
+
+        def make(row):
+            group = row.get('group')
+            if group and group not in self.groups:
+                raise RowError(f'Неизвестная группа {group}')
+            text = clean(POST_TEXT, row.get('text'))
+            image = row.get('image') or ''
+            width, height = self.image_size(image) if image else (None, None)
+            post = Post(
+                text=text,
+                text_html=markup.render(text),
+                text_html_version=markup.VERSION,
+                signature=minhash.signature(text),
+                author_id=self.author_id(row),
+                group_id=self.groups.get(group),
+                image=image,
+                image_width=width,
+                image_height=height,
+            )
+            post.pub_date = self.parse_date(row)
+            return post
+        posts, keys = self.build(rows, make)
+        with transaction.atomic():
+            self.insert(Post, posts, keys, self.posts)
+            # Каждый пост с картинкой держит свою ссылку на файл, иначе
+            # его удаление стёрло бы файл, нужный другим постам
+            images = Counter(post.image.name for post in posts if post.image)
+            for name, count in images.items():
+                StoredFile.objects.filter(pk=name).update(
+                    refs=F('refs') + count
+                )
+        tags.index_posts(posts)
+        minhash.index_posts(posts)
+        self.counts['post'] += len(posts)
+
+    def import_comments(self, rows):
+        self.resolve_users(
+            row.get('author') or self.default_author for _, row in rows
+        )
+
+        def make(row):
+            post_id = self.posts.get(row.get('post_id'))
+            if post_id is None:
+                raise RowError(f'Неизвестный пост {row.get("post_id")}')
+            text = clean(COMMENT_TEXT, row.get('text'))
+            comment = Comment(
+                text=text,
+                text_html=markup.render(text),
+                text_html_version=markup.VERSION,
+                author_id=self.author_id(row),
+                post_id=post_id,
+            )
+            comment.created = self.parse_date(row)
+            return comment
+        comments, _ = self.build(rows, make)
+        with transaction.atomic():
+            Comment.objects.bulk_create(comments)
+        self.counts['comment'] += len(comments)
+
+    def import_follows(self, rows):
+        self.resolve_users(
+            name for _, row in rows
+            for name in (row.get('user'), row.get('author'))
+        )
+
+        def make(row):
+            user_id = self.author_id(row, 'user')
+            author_id = self.author_id(row)
+            if user_id == author_id:
+                raise RowError('Нельзя подписаться на самого себя')
+            return Follow(user_id=user_id, author_id=author_id)
+        new_follows, _ = self.build(rows, make)
+        with transaction.atomic():
+            Follow.objects.bulk_create(new_follows, ignore_conflicts=True)
+        follows.forget({follow.user_id for follow in new_follows})
+        self.counts['follow'] += len(new_follows)
+
+    @staticmethod
+    def insert(model, objects, keys, id_map):
+        """bulk_create с сопоставлением внешних id с новыми pk.
+
+        SQLite не возвращает pk из bulk_create, но внутри транзакции
+        новые строки получают возрастающие pk подряд.
+        """
+        with transaction.atomic():
+            last_pk = model.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ).first() or 0
+            model.objects.bulk_create(objects)
+            if objects and objects[0].pk is None:
+                new_pks = model.objects.filter(pk__gt=last_pk).order_by(
+                    'pk'
+                ).values_list('pk', flat=True)
+                for obj, pk in zip(objects, new_pks):
+                    obj.pk = pk
+        for key, obj in zip(keys, objects):
+            if key is not None:
+                id_map[key] = obj.pk
+
+    @staticmethod
+    def parse_date(row):
+        value = row.get('date')
+        date = parse_datetime(value) if value else None
+        if value and date is None:
+            raise RowError(f'Некорректная дата {value}')
+        return date or timezone.now()
+
+    def rebuild(self):
+        """Пересчитывает производные данные после загрузки."""
+        trending.refresh()
+        # bulk_create не шлёт сигналов, сбрасывающих кэш страниц
+        bump_content_version()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,69 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Group
+
+User = get_user_model()
+
+# Отметка "такого нет" в кэше: отличается от промаха (None)
+MISSING = 0
+
+
+def group_key(slug):
+    return 'resolve:group:' + md5(slug.encode()).hexdigest()
+
+
+def user_key(username):
+    return 'resolve:user:' + md5(username.encode()).hexdigest()
+
+
+def resolve(key, load):
+    """Значение из кэша, а при промахе - из load() с кэшированием.
+
+    Отсутствующие объекты тоже кэшируются, но ненадолго: перебор
+    случайных адресов ботами не доходит до БД.
+    """
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        if value is None:
+            cache.set(key, MISSING, settings.RESOLVE_MISSING_TIMEOUT)
+            return None
+        cache.set(key, value, settings.RESOLVE_CACHE_TIMEOUT)
+    return value or None
+
+
+def get_group_or_404(slug):
+    group = resolve(
+        group_key(slug),
+        Group.objects.filter(slug=slug, is_deleted=False).first
+    )
+    if group is None:
+        raise Http404
+    return group
+
+
+def get_user_id_or_404(username):
+    user_id = resolve(
+        user_key(username),
+        User.objects.filter(
+            username=username, deletion__isnull=True
+        ).values_list(
+            'pk', flat=True
+        ).first
+    )
+    if user_id is None:
+        raise Http404
+    return user_id
+
+
+def forget_group(slug):
+    cache.delete(group_key(slug))
+
+
+def forget_user(username):
+    cache.delete(user_key(username))
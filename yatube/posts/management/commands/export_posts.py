@@ -0,0 +1,47 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exports import FORMATS
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты и комментарии пользователя'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--format', choices=FORMATS, default='ndjson',
+            help='Формат выгрузки'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки (по умолчанию stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Сколько строк за раз читать из БД'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден'
+            )
+        export, _ = FORMATS[options['format']]
+        chunks = export(author, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(self.encode(chunk))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(self.encode(chunk))
+
+    @staticmethod
+    def encode(chunk):
+        return chunk.encode() if isinstance(chunk, str) else chunk
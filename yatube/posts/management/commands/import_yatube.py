@@ -0,0 +1,57 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.importing import Importer
+
+
+class Command(BaseCommand):
+    help = 'Загружает группы, посты, комментарии и подписки из NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы NDJSON (по умолчанию stdin)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк писать в БД за одну транзакцию'
+        )
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Создавать отсутствующих пользователей'
+        )
+        parser.add_argument(
+            '--author',
+            help='Автор для строк без поля author (выгрузка export_posts)'
+        )
+
+    def handle(self, *args, **options):
+        importer = Importer(
+            batch_size=options['batch_size'],
+            create_users=options['create_users'],
+            default_author=options['author'],
+        )
+        elapsed = 0
+        for lines in self.sources(options['paths']):
+            elapsed += importer.run(lines)
+        importer.rebuild()
+        for number, message in importer.errors:
+            self.stderr.write(f'Строка {number}: {message}')
+        total = sum(importer.counts.values())
+        for kind, count in sorted(importer.counts.items()):
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(
+            f'Загружено строк: {total} за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с), '
+            f'ошибок: {len(importer.errors)}'
+        )
+
+    @staticmethod
+    def sources(paths):
+        if not paths:
+            yield sys.stdin
+            return
+        for path in paths:
+            with open(path, encoding='utf-8') as lines:
+                yield lines
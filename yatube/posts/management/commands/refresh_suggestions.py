@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from posts import suggestions
+from posts.tasks import refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации подписок по графу подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Поставить периодический пересчёт в очередь run_worker'
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            enqueue(refresh_suggestions,
+                    idempotency_key='refresh_suggestions')
+            self.stdout.write('Пересчёт рекомендаций поставлен в очередь')
+            return
+        count = suggestions.refresh()
+        self.stdout.write(f'Рекомендации посчитаны для {count} пользователей')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from posts import trending
+from posts.tasks import refresh_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Поставить периодический пересчёт в очередь run_worker'
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            enqueue(refresh_trending, idempotency_key='refresh_trending')
+            self.stdout.write('Пересчёт рейтинга поставлен в очередь')
+            return
+        count = trending.refresh()
+        self.stdout.write(f'Рейтинг пересчитан для {count} постов')
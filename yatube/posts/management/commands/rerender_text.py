@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import bump_content_version
+from posts import markup, minhash, tags
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает HTML текстов, отрисованных старой версией разметки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько записей обновлять за одну транзакцию'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перестроить все тексты, а не только устаревшие'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in (Post, Comment):
+            count = self.rerender(model, options['batch_size'],
+                                  options['all'])
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {count}'
+            )
+            total += count
+        if total:
+            bump_content_version()
+
+    @staticmethod
+    def rerender(model, batch_size, everything):
+        """Обходит таблицу по первичному ключу пачками по batch_size.
+
+        Для постов заодно пересобираются хештеги и подписи MinHash.
+        """
+        fields = ('pk', 'text', 'pub_date') if model is Post else (
+            'pk', 'text'
+        )
+        queryset = model.objects.order_by('pk').only(*fields)
+        if not everything:
+            queryset = queryset.exclude(text_html_version=markup.VERSION)
+        last_pk = count = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return count
+            updated = ['text_html', 'text_html_version']
+            for obj in batch:
+                obj.text_html = markup.render(obj.text)
+                obj.text_html_version = markup.VERSION
+                if model is Post:
+                    obj.signature = minhash.signature(obj.text)
+            if model is Post:
+                updated.append('signature')
+            with transaction.atomic():
+                model.objects.bulk_update(batch, updated)
+                if model is Post:
+                    tags.index_posts(batch)
+                    minhash.index_posts(batch)
+            last_pk = batch[-1].pk
+            count += len(batch)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from posts import notifications
+from posts.tasks import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает письма-сводки о непрочитанных уведомлениях'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Поставить периодическую рассылку в очередь run_worker'
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            enqueue(send_digests, idempotency_key='send_digests')
+            self.stdout.write('Рассылка сводок поставлена в очередь')
+            return
+        sent = notifications.send_digests()
+        self.stdout.write(f'Отправлено сводок: {sent}')
@@ -0,0 +1,130 @@
+"""Разметка текстов постов и комментариев.
+
+Поддерживается небольшое безопасное подмножество Markdown: абзацы,
+переносы строк, цитаты "> ", списки "- ", блоки кода ```, `код`,
+**жирный**, *курсив*, ссылки [текст](https://...), а также
+автоссылки, упоминания @username и хештеги #тег. Весь остальной текст
+экранируется, поэтому результат можно выводить без очистки.
+
+HTML строится при сохранении и хранится в text_html вместе с VERSION;
+после изменения правил VERSION увеличивается, и старые тексты
+перестраивает команда rerender_text.
+"""
+import re
+
+from django.urls import reverse
+from django.utils.html import escape
+
+VERSION = 3
+
+# Хештег должен содержать букву; по тому же шаблону теги
+# попадают в индекс, см. posts.tags
+HASHTAG = r'(?<![\w&/#])#(?P<tag>\w*[^\W\d_]\w*)'
+FENCE = '```'
+QUOTE = re.compile(r'^>\s?')
+LIST_ITEM = re.compile(r'^[-*]\s+')
+INLINE = re.compile(
+    r'`(?P<code>[^`\n]+)`'
+    r'|\[(?P<label>[^\[\]\n]+)\]\((?P<href>https?://[^\s)]+)\)'
+    r'|(?P<url>https?://[^\s<>"]*[^\s<>".,:;!?\')\]])'
+    r'|(?<![\w@])@(?P<mention>[\w+-]+(?:\.[\w+-]+)*)'
+    r'|' + HASHTAG
+)
+# Тело выделения не содержит своего разделителя: каждая попытка
+# просматривает текст только до следующего разделителя, и время
+# разбора растёт линейно, а не квадратично, как у (.+?)
+STRONG = re.compile(r'\*\*([^\s*](?:[^*\n]*[^\s*])?)\*\*')
+EMPHASIS = re.compile(
+    r'(?<!\w)(?:\*([^\s*](?:[^*\n]*[^\s*])?)\*'
+    r'|_([^\s_](?:[^_\n]*[^\s_])?)_)(?!\w)'
+)
+
+
+def link(href, label):
+    return (f'<a href="{escape(href)}" rel="nofollow noopener">'
+            f'{label}</a>')
+
+
+def emphasis(text):
+    """Экранированный текст с **жирным** и *курсивом*."""
+    text = STRONG.sub(r'<strong>\1</strong>', escape(text))
+    return EMPHASIS.sub(
+        lambda match: f'<em>{match[1] or match[2]}</em>', text
+    )
+
+
+def inline(text):
+    parts = []
+    position = 0
+    for match in INLINE.finditer(text):
+        parts.append(emphasis(text[position:match.start()]))
+        position = match.end()
+        if match['code']:
+            parts.append(f'<code>{escape(match["code"])}</code>')
+        elif match['href']:
+            parts.append(link(match['href'], emphasis(match['label'])))
+        elif match['url']:
+            parts.append(link(match['url'], escape(match['url'])))
+        elif match['tag']:
+            tag = match['tag']
+            parts.append(
+                f'<a href="{reverse("posts:tag_posts", args=(tag.lower(),))}">'
+                f'#{escape(tag)}</a>'
+            )
+        else:
+            username = match['mention']
+            parts.append(
+                f'<a href="{reverse("posts:profile", args=(username,))}">'
+                f'@{escape(username)}</a>'
+            )
+    parts.append(emphasis(text[position:]))
+    return ''.join(parts)
+
+
+def block(kind, lines):
+    if kind == 'code':
+        return f'<pre><code>{escape(chr(10).join(lines))}</code></pre>'
+    if kind == 'list':
+        items = ''.join(f'<li>{inline(line)}</li>' for line in lines)
+        return f'<ul>{items}</ul>'
+    paragraph = '<p>{}</p>'.format('<br>'.join(map(inline, lines)))
+    if kind == 'quote':
+        return f'<blockquote>{paragraph}</blockquote>'
+    return paragraph
+
+
+def classify(line):
+    """Вид блока, к которому относится строка, и строка без маркера."""
+    if line.strip() == FENCE:
+        return 'code', line
+    if not line.strip():
+        return None, line
+    if QUOTE.match(line):
+        return 'quote', QUOTE.sub('', line)
+    if LIST_ITEM.match(line):
+        return 'list', LIST_ITEM.sub('', line)
+    return 'text', line
+
+
+def render(text):
+    """HTML для текста поста или комментария."""
+    blocks = []
+    kind, lines = None, []
+    for line in text.replace('\r\n', '\n').split('\n'):
+        if kind == 'code':
+            if line.strip() == FENCE:
+                blocks.append(block(kind, lines))
+                kind, lines = None, []
+            else:
+                lines.append(line)
+            continue
+        line_kind, line = classify(line)
+        if line_kind != kind:
+            if lines:
+                blocks.append(block(kind, lines))
+            kind, lines = line_kind, []
+        if line_kind not in (None, 'code'):
+            lines.append(line.strip())
+    if lines:
+        blocks.append(block(kind, lines))
+    return '\n'.join(blocks)
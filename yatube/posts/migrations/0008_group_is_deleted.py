@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
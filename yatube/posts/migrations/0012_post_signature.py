@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_follow_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_duplicate',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Похож на другой пост'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='signature',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.CreateModel(
+            name='SignatureBand',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='posts.Post')),
+            ],
+            options={
+                'verbose_name': 'Полоса подписи поста',
+                'verbose_name_plural': 'Полосы подписей постов',
+            },
+        ),
+    ]
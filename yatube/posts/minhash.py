@@ -0,0 +1,102 @@
+"""Поиск почти одинаковых постов по подписям MinHash.
+
+Текст разбивается на пары соседних слов, и подпись - HASHES минимумов
+независимых хэш-функций по этим парам. Доля совпавших минимумов у двух
+подписей оценивает сходство Жаккара их текстов. Подпись делится на
+BANDS полос по ROWS минимумов, и хэш каждой полосы хранится
+в SignatureBand с индексом: у похожих текстов хотя бы одна полоса
+почти наверняка совпадает целиком, а у непохожих - почти никогда.
+Поэтому кандидаты находятся одним запросом по индексу, сколько бы
+постов ни было, и лишь они сверяются по полной подписи.
+"""
+import hashlib
+import re
+import struct
+from random import Random
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import SignatureBand
+
+HASHES = 32
+ROWS = 4
+BANDS = HASHES // ROWS
+PRIME = (1 << 61) - 1
+FORMAT = f'>{HASHES}I'
+TOKEN = re.compile(r'\w+')
+
+# Коэффициенты хэш-функций (a * x + b) mod PRIME. Они фиксированы:
+# от них зависят сохранённые подписи
+_random = Random(20211001)
+COEFFICIENTS = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME))
+    for _ in range(HASHES)
+]
+
+
+def stable_hash(data):
+    return int.from_bytes(hashlib.md5(data).digest()[:8], 'big')
+
+
+def signature(text):
+    """Подпись текста или None, если в нём меньше DUPLICATE_MIN_TOKENS слов.
+
+    Пары слов, а не отдельные слова, дают тексту с заменой одного
+    слова всё ещё высокое сходство, а случайным текстам с общими
+    предлогами - почти нулевое.
+    """
+    words = TOKEN.findall(text.lower())
+    if len(words) < settings.DUPLICATE_MIN_TOKENS:
+        return None
+    values = {
+        stable_hash(f'{first} {second}'.encode())
+        for first, second in zip(words, words[1:])
+    }
+    return struct.pack(FORMAT, *(
+        min((a * value + b) % PRIME for value in values) & 0xFFFFFFFF
+        for a, b in COEFFICIENTS
+    ))
+
+
+def similarity(first, second):
+    """Оценка сходства Жаккара по двум подписям."""
+    pairs = zip(struct.unpack(FORMAT, first), struct.unpack(FORMAT, second))
+    return sum(a == b for a, b in pairs) / HASHES
+
+
+def band_keys(value):
+    # Старший бит отброшен: SQLite хранит знаковые 64-битные числа
+    size = len(value) // BANDS
+    return [
+        stable_hash(bytes([band]) + value[band * size:(band + 1) * size]) >> 1
+        for band in range(BANDS)
+    ]
+
+
+def near_duplicates(value, exclude=None):
+    """id постов, похожих на подпись value не меньше DUPLICATE_SIMILARITY."""
+    if value is None:
+        return []
+    candidates = SignatureBand.objects.filter(
+        key__in=band_keys(value)
+    ).exclude(post_id=exclude).values_list(
+        'post_id', 'post__signature'
+    ).distinct()
+    return [
+        post_id for post_id, other in candidates
+        if similarity(value, bytes(other)) >= settings.DUPLICATE_SIMILARITY
+    ]
+
+
+def index_posts(posts):
+    """Заменяет полосы подписей постов на полосы их текущей подписи."""
+    with transaction.atomic():
+        SignatureBand.objects.filter(
+            post_id__in=[post.pk for post in posts]
+        ).delete()
+        SignatureBand.objects.bulk_create(
+            SignatureBand(post_id=post.pk, key=key)
+            for post in posts if post.signature is not None
+            for key in band_keys(bytes(post.signature))
+        )
@@ -1,15 +1,25 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
 from django.db.models.constraints import UniqueConstraint
 from django.db.models.deletion import SET_NULL
 
+from core.storage import post_image_storage
+
 User = get_user_model()
 
+# Предел длины текстов постов и комментариев: их разметка строится
+# прямо в запросе, см. posts.markup
+TEXT_MAX_LENGTH = 10000
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=50, unique=True)
     description = models.TextField()
+    # Удалённая из админки группа скрыта сразу, а записи отвязываются
+    # от неё фоновой задачей, см. posts.purge
+    is_deleted = models.BooleanField(default=False, editable=False)
 
     def __str__(self):
         return self.title
@@ -19,8 +29,44 @@ class Group(models.Model):
         verbose_name_plural = 'Группы'
 
 
+class DeletedUser(models.Model):
+    """Пометка удалённого из админки пользователя.
+
+    Аналог Group.is_deleted: в auth.User своего поля не добавить,
+    а is_active отвечает за вход на сайт и снимается не только при
+    удалении. Пользователь с пометкой скрыт сразу, а его записи
+    удаляются фоновой задачей, см. posts.purge. Удаление пометки
+    восстанавливает пользователя, если очистка ещё не закончилась.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion'
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.user)
+
+    class Meta:
+        verbose_name = 'Удалённый пользователь'
+        verbose_name_plural = 'Удалённые пользователи'
+
+
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты без удалённых авторов."""
+        return self.filter(author__deletion__isnull=True)
+
+
 class Post(models.Model):
-    text = models.TextField()
+    text = models.TextField(max_length=TEXT_MAX_LENGTH)
+    # Готовый HTML текста, см. posts.markup
+    text_html = models.TextField(blank=True, editable=False)
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
     pub_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(
         User,
@@ -37,8 +83,25 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=post_image_storage,
         blank=True
     )
+    # Размеры оригинала заполняются при загрузке, см. posts.signals
+    image_width = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    # Накапливается в памяти и сбрасывается пачкой, см. posts.counters
+    views = models.PositiveIntegerField('Просмотры', default=0)
+    # Подпись MinHash для поиска почти одинаковых постов, см. posts.minhash
+    signature = models.BinaryField(null=True, editable=False)
+    is_duplicate = models.BooleanField(
+        'Похож на другой пост', default=False, editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
@@ -49,6 +112,12 @@ class Post(models.Model):
         verbose_name_plural = 'Посты'
 
 
+class CommentQuerySet(models.QuerySet):
+    def visible(self):
+        """Комментарии без удалённых авторов."""
+        return self.filter(author__deletion__isnull=True)
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
@@ -62,8 +131,14 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
-    text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    text = models.TextField(max_length=TEXT_MAX_LENGTH)
+    text_html = models.TextField(blank=True, editable=False)
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:30]
@@ -74,6 +149,90 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
 
 
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    # Поддерживается при индексации постов, см. posts.tags
+    posts_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return self.title
+
+    @property
+    def title(self):
+        return f'#{self.name}'
+
+    @property
+    def description(self):
+        return f'Посты с хештегом #{self.name}'
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Хештег'
+        verbose_name_plural = 'Хештеги'
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags'
+    )
+    # Копия Post.pub_date: лента тега читается по индексу (tag, pub_date)
+    pub_date = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.post_id}: {self.tag_id}'
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['post', 'tag'], name='unique_post_tag'),
+        ]
+        indexes = [models.Index(fields=['tag', '-pub_date'])]
+        verbose_name = 'Хештег поста'
+        verbose_name_plural = 'Хештеги постов'
+
+
+class SignatureBand(models.Model):
+    """Хэш полосы подписи поста: по совпадению полос ищутся кандидаты."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='signature_bands'
+    )
+    key = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.key}'
+
+    class Meta:
+        verbose_name = 'Полоса подписи поста'
+        verbose_name_plural = 'Полосы подписей постов'
+
+
+class PostRank(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank'
+    )
+    score = models.FloatField(db_index=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинг постов'
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         User,
@@ -95,5 +254,98 @@ class Follow(models.Model):
                 fields=['user', 'author'], name='unique_following'
             ),
         ]
+        # Рассылка уведомлений идёт по подписчикам автора порциями
+        indexes = [models.Index(fields=['author', 'user'])]
         verbose_name = 'Подписка на автора'
         verbose_name_plural = 'Подписки на авторов'
+
+
+class PostEvent(models.Model):
+    """Новый пост, о котором нужно уведомить подписчиков автора."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='event'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+    notified = models.PositiveIntegerField(default=0)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Новый пост {self.post_id}'
+
+    class Meta:
+        verbose_name = 'Событие о посте'
+        verbose_name_plural = 'События о постах'
+
+
+class Notification(models.Model):
+    """Сводка о новых постах автора для подписчика.
+
+    Пока сводка не прочитана, новые посты того же автора увеличивают
+    count, а не добавляют строки.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+    emailed = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.count} от {self.author_id}'
+
+    class Meta:
+        ordering = ['-updated']
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'author'],
+                condition=Q(is_read=False),
+                name='unique_unread_notification'
+            ),
+        ]
+        indexes = [models.Index(fields=['user', 'is_read'])]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+
+class FollowSuggestion(models.Model):
+    """Автор, на которого стоит подписаться; считается пакетно."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}: {self.score:.3f}'
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'author'], name='unique_suggestion'
+            ),
+        ]
+        indexes = [models.Index(fields=['user', '-score'])]
+        verbose_name = 'Рекомендация подписки'
+        verbose_name_plural = 'Рекомендации подписок'
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Follow, Notification, PostEvent
+
+User = get_user_model()
+
+
+def unread_count(user):
+    """Число непрочитанных постов; читает только индекс (user, is_read)."""
+    return Notification.objects.filter(
+        user=user, is_read=False
+    ).aggregate(total=Sum('count'))['total'] or 0
+
+
+def notify_chunk(event, after_user_id=0):
+    """Уведомляет следующую порцию подписчиков с id больше after_user_id.
+
+    Возвращает id последнего подписчика порции или None, если
+    подписчики закончились.
+    """
+    post = event.post
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id, user_id__gt=after_user_id
+    ).order_by('user_id').values_list(
+        'user_id', flat=True
+    )[:settings.NOTIFICATIONS_CHUNK_SIZE])
+    with transaction.atomic():
+        unread = Notification.objects.filter(
+            user_id__in=followers, author_id=post.author_id, is_read=False
+        )
+        existing = set(unread.values_list('user_id', flat=True))
+        unread.update(
+            count=F('count') + 1, post=post, emailed=False,
+            updated=timezone.now()
+        )
+        Notification.objects.bulk_create([
+            Notification(user_id=user_id, author_id=post.author_id, post=post)
+            for user_id in followers if user_id not in existing
+        ], ignore_conflicts=True)
+        PostEvent.objects.filter(pk=event.pk).update(
+            notified=F('notified') + len(followers)
+        )
+    if len(followers) < settings.NOTIFICATIONS_CHUNK_SIZE:
+        PostEvent.objects.filter(pk=event.pk).update(finished=timezone.now())
+        return None
+    return followers[-1]
+
+
+def send_digests():
+    """Письма со сводкой непрочитанных уведомлений, одно на пользователя.
+
+    Письма уходят через EMAIL_BACKEND, то есть в очередь отправки.
+    Возвращает число отправленных писем.
+    """
+    users = User.objects.filter(
+        notifications__is_read=False, notifications__emailed=False
+    ).exclude(email='').distinct().order_by('pk')
+    connection = get_connection()
+    sent = 0
+    for user in users.iterator():
+        notifications = list(Notification.objects.filter(
+            user=user, is_read=False, emailed=False
+        ).select_related('author', 'post'))
+        message = EmailMessage(
+            'Новые посты в ваших подписках',
+            render_to_string('posts/email/digest.txt', {
+                'user': user, 'notifications': notifications,
+            }),
+            to=[user.email],
+        )
+        connection.send_messages([message])
+        Notification.objects.filter(
+            pk__in=[notification.pk for notification in notifications]
+        ).update(emailed=True)
+        sent += 1
+    return sent
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from core.cache import bump_content_version
+
+from .lookups import forget_group, forget_user
+from .models import (Comment, DeletedUser, Follow, FollowSuggestion, Group,
+                     Notification, Post)
+
+User = get_user_model()
+
+
+def hide_users(queryset):
+    """Скрывает пользователей и их записи; возвращает id для очистки.
+
+    Сам пользователь и всё связанное с ним удаляются потом порциями
+    (purge_user_chunk), чтобы не держать блокировку БД на всё время
+    каскадного удаления.
+    """
+    users = dict(queryset.values_list('pk', 'username'))
+    DeletedUser.objects.bulk_create(
+        [DeletedUser(user_id=pk) for pk in users], ignore_conflicts=True
+    )
+    for username in users.values():
+        forget_user(username)
+    bump_content_version()
+    return list(users)
+
+
+def hide_groups(queryset):
+    """Скрывает группы; возвращает id групп для очистки."""
+    groups = dict(queryset.values_list('pk', 'slug'))
+    Group.objects.filter(pk__in=groups).update(is_deleted=True)
+    for slug in groups.values():
+        forget_group(slug)
+    bump_content_version()
+    return list(groups)
+
+
+def delete_chunk(queryset):
+    """Удаляет до PURGE_CHUNK_SIZE объектов; False, если удалять нечего."""
+    ids = list(queryset.values_list('pk', flat=True)[
+        :settings.PURGE_CHUNK_SIZE
+    ])
+    if not ids:
+        return False
+    with transaction.atomic():
+        # Сигналы post_delete срабатывают, поэтому освобождаются
+        # и картинки удалённых постов
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return True
+
+
+def purge_user_chunk(user_id):
+    """Удаляет следующую порцию записей скрытого пользователя.
+
+    Возвращает True, когда очистка закончена: удалён сам пользователь
+    или его успели восстановить.
+    """
+    if not DeletedUser.objects.filter(user_id=user_id).exists():
+        return True
+    steps = (
+        Comment.objects.filter(author_id=user_id),
+        Comment.objects.filter(post__author_id=user_id),
+        Notification.objects.filter(author_id=user_id),
+        Notification.objects.filter(user_id=user_id),
+        Post.objects.filter(author_id=user_id),
+        Follow.objects.filter(user_id=user_id),
+        Follow.objects.filter(author_id=user_id),
+        FollowSuggestion.objects.filter(user_id=user_id),
+        FollowSuggestion.objects.filter(author_id=user_id),
+    )
+    if any(delete_chunk(queryset) for queryset in steps):
+        return False
+    User.objects.filter(pk=user_id).delete()
+    return True
+
+
+def purge_group_chunk(group_id):
+    """Отвязывает от скрытой группы следующую порцию постов.
+
+    Возвращает True, когда очистка закончена и группа удалена.
+    """
+    if not Group.objects.filter(pk=group_id, is_deleted=True).exists():
+        return True
+    ids = list(Post.objects.filter(group_id=group_id).values_list(
+        'pk', flat=True
+    )[:settings.PURGE_CHUNK_SIZE])
+    if ids:
+        Post.objects.filter(pk__in=ids).update(group=None)
+        return False
+    Group.objects.filter(pk=group_id).delete()
+    bump_content_version()
+    return True
@@ -0,0 +1,152 @@
+from django.contrib.auth import get_user_model
+from django.core.files.images import get_image_dimensions
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.cache import bump_content_version
+from core.signals import page_cache_hit
+
+from . import follows, markup, minhash, tags
+from .counters import view_counter
+from .lookups import forget_group, forget_user
+from .models import Comment, Follow, Group, Post, Tag
+
+User = get_user_model()
+
+for model in (Post, Comment, Group):
+    post_save.connect(bump_content_version, sender=model)
+    post_delete.connect(bump_content_version, sender=model)
+post_delete.connect(bump_content_version, sender=User)
+
+
+@receiver(post_save, sender=User)
+def bump_on_user_change(sender, update_fields=None, **kwargs):
+    # Вход обновляет только last_login; страницы от этого не меняются
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        bump_content_version()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text(sender, instance, update_fields=None, **kwargs):
+    """HTML текста строится при сохранении, ленты его только выводят."""
+    if update_fields is None or 'text' in update_fields:
+        instance.text_html = markup.render(instance.text)
+        instance.text_html_version = markup.VERSION
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    # Новому посту без хештегов нечего ни добавлять, ни удалять
+    if not created or tags.extract(instance.text):
+        tags.index_posts([instance])
+
+
+@receiver(pre_save, sender=Post)
+def store_signature(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        instance.signature = minhash.signature(instance.text)
+
+
+@receiver(post_save, sender=Post)
+def index_signature(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    if not created or instance.signature is not None:
+        minhash.index_posts([instance])
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_tags(sender, instance, **kwargs):
+    Tag.objects.filter(post_tags__post=instance).update(
+        posts_count=F('posts_count') - 1
+    )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def forget_follows(sender, instance, **kwargs):
+    follows.forget([instance.user_id])
+
+
+@receiver(pre_save, sender=Group)
+def forget_renamed_group(sender, instance, **kwargs):
+    if instance.pk is not None:
+        old_slug = Group.objects.filter(pk=instance.pk).values_list(
+            'slug', flat=True
+        ).first()
+        if old_slug:
+            forget_group(old_slug)
+
+
+@receiver(pre_save, sender=User)
+def forget_renamed_user(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or update_fields == frozenset({'last_login'}):
+        return
+    old_username = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    if old_username:
+        forget_user(old_username)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_group_slug(sender, instance, **kwargs):
+    # Новый slug мог быть закэширован как отсутствующий
+    forget_group(instance.slug)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_username(sender, instance, **kwargs):
+    forget_user(instance.username)
+
+
+@receiver(page_cache_hit)
+def count_cached_post_view(sender, url_name, kwargs, **extra):
+    if url_name == 'posts:post_detail':
+        view_counter.hit(kwargs['post_id'])
+
+
+def release_image(storage, name):
+    # Файл освобождается только если транзакция с изменением поста прошла
+    transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_post_image(sender, instance, **kwargs):
+    if instance.image:
+        release_image(instance.image.storage, instance.image.name)
+
+
+@receiver(pre_save, sender=Post)
+def release_replaced_post_image(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    old_name = Post.objects.filter(pk=instance.pk).values_list(
+        'image', flat=True
+    ).first()
+    # Новая загрузка берёт свою ссылку, даже если содержимое то же
+    # и имя файла не изменилось, поэтому старая ссылка снимается всегда
+    replaced = (old_name != instance.image.name
+                or not instance.image._committed)
+    if old_name and replaced:
+        release_image(instance.image.storage, old_name)
+
+
+@receiver(pre_save, sender=Post)
+def store_image_size(sender, instance, **kwargs):
+    """Запоминает размеры новой картинки, пока она ещё в памяти."""
+    image = instance.image
+    if not image:
+        instance.image_width = instance.image_height = None
+    elif not image._committed:
+        instance.image_width, instance.image_height = get_image_dimensions(
+            image.file
+        )
@@ -0,0 +1,139 @@
+import bisect
+import json
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Post
+
+
+class Hub:
+    """Журнал новых постов в памяти процесса.
+
+    Единственный источник - таблица постов: id растут, но транзакции
+    коммитятся не по порядку, и пост с меньшим id может появиться в БД
+    позже поста с большим. Поэтому БД опрашивается не от последнего
+    увиденного id, а от safe_id - наибольшего id, увиденного не меньше
+    SSE_COMMIT_GRACE секунд назад: к этому времени посты с меньшими id
+    уже закоммичены. Опрос идёт одним запросом не чаще раза
+    в SSE_POLL_INTERVAL на весь процесс, сколько бы слушателей ни
+    опрашивало поток.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        # (id, author_id) по возрастанию id
+        self.events = []
+        self.lock = threading.Lock()
+        # Все закоммиченные к последнему опросу посты с id больше floor
+        # есть в events
+        self.floor = None
+        self.safe_id = None
+        # (время опроса, наибольший увиденный id), ещё не ставшие safe_id
+        self.marks = deque()
+        self.last_poll = 0
+
+    def start(self):
+        with self.lock:
+            if self.floor is None:
+                # Более свежие посты могут быть ещё не закоммичены:
+                # их подберёт первый опрос
+                border = timezone.now() - timedelta(
+                    seconds=settings.SSE_COMMIT_GRACE
+                )
+                self.floor = self.safe_id = Post.objects.filter(
+                    pub_date__lte=border
+                ).order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def publish(self):
+        """Новый пост этого процесса: опросить БД, не дожидаясь срока."""
+        self.poll(force=True)
+
+    def poll(self, force=False):
+        self.start()
+        with self.lock:
+            now = time.monotonic()
+            if not force and (
+                now - self.last_poll < settings.SSE_POLL_INTERVAL
+            ):
+                return
+            self.last_poll = now
+            safe_id = self.safe_id
+        rows = list(Post.objects.filter(pk__gt=safe_id).order_by(
+            'pk'
+        ).values_list('pk', 'author_id')[:self.size])
+        with self.lock:
+            for row in rows:
+                index = bisect.bisect_left(self.events, row)
+                if row[0] <= self.floor or row in self.events[
+                    index:index + 1
+                ]:
+                    continue
+                self.events.insert(index, row)
+            if len(self.events) > self.size:
+                self.floor = self.events[-self.size - 1][0]
+                del self.events[:-self.size]
+            if rows:
+                self.marks.append((now, rows[-1][0]))
+            while self.marks and (
+                now - self.marks[0][0] >= settings.SSE_COMMIT_GRACE
+            ):
+                self.safe_id = max(self.safe_id, self.marks.popleft()[1])
+
+    def since(self, last_id):
+        """Посты новее last_id: из памяти, а если они уже вытеснены - из БД."""
+        self.start()
+        with self.lock:
+            if last_id >= self.floor:
+                return [event for event in self.events if event[0] > last_id]
+        return list(Post.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).values_list('pk', 'author_id')[:self.size])
+
+
+hub = Hub(settings.SSE_BUFFER_SIZE)
+
+
+def event(post_id):
+    data = json.dumps({
+        'id': post_id,
+        'url': reverse('posts:post_detail', args=(post_id,)),
+    })
+    return f'event: post\ndata: {data}\n\n'
+
+
+def event_batch(last_id=None, authors=None):
+    """Ответ text/event-stream с постами новее last_id.
+
+    authors ограничивает ответ постами этих авторов. Соединение не
+    держится открытым: ответ сразу закрывается, и браузер сам
+    переподключается через SSE_RETRY секунд, передавая Last-Event-ID
+    из последней строки id:. Поэтому слушатель не занимает поток
+    WSGI между опросами, а опрос обходится чтением из памяти.
+
+    id: не уходит дальше safe_id, так что посты выше него приходят
+    снова, пока safe_id их не минует: поздно закоммиченный пост с
+    меньшим id не теряется, а повторы браузер отбрасывает по id поста.
+    """
+    hub.poll()
+    if last_id is None:
+        events = []
+        last_id = hub.safe_id
+    else:
+        events = hub.since(last_id)
+        # Отданное из БД может быть обрезано: id не должен уйти дальше
+        last_id = max(last_id, min(
+            hub.safe_id, events[-1][0] if events else hub.safe_id
+        ))
+    lines = [f'retry: {settings.SSE_RETRY * 1000}\n\n']
+    for post_id, author_id in events:
+        if authors is None or author_id in authors:
+            lines.append(event(post_id))
+    # Событие без данных только запоминает id в браузере
+    lines.append(f'id: {last_id}\n\n')
+    return ''.join(lines)
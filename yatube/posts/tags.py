@@ -0,0 +1,102 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .markup import HASHTAG
+from .models import PostTag, Tag
+
+TAG = re.compile(HASHTAG)
+MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def extract(text):
+    """Имена хештегов текста в нижнем регистре."""
+    return {
+        match['tag'].lower() for match in TAG.finditer(text)
+        if len(match['tag']) <= MAX_LENGTH
+    }
+
+
+def tag_ids(names):
+    """id тегов по именам; недостающие теги создаются."""
+    if not names:
+        return {}
+    ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = set(names) - set(ids)
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        ids.update(Tag.objects.filter(
+            name__in=missing
+        ).values_list('name', 'pk'))
+    return ids
+
+
+def change_counts(deltas):
+    """Сдвигает posts_count тегов: один UPDATE на каждую величину сдвига."""
+    by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(tag_id)
+    for delta, ids in by_delta.items():
+        Tag.objects.filter(pk__in=ids).update(
+            posts_count=F('posts_count') + delta
+        )
+
+
+def index_posts(posts):
+    """Приводит строки PostTag постов в соответствие с их текстом.
+
+    Работает пачкой: и для одного сохранённого поста, и для постов
+    импорта или rerender_text. Счётчики тегов сдвигаются на разницу.
+    """
+    wanted = {post.pk: extract(post.text) for post in posts}
+    ids = tag_ids(set().union(*wanted.values()))
+    wanted = {
+        post_id: {ids[name] for name in names}
+        for post_id, names in wanted.items()
+    }
+    stale, deltas = [], Counter()
+    existing = PostTag.objects.filter(post_id__in=wanted).values_list(
+        'pk', 'post_id', 'tag_id'
+    )
+    for pk, post_id, tag_id in existing:
+        if tag_id in wanted[post_id]:
+            wanted[post_id].discard(tag_id)
+        else:
+            stale.append(pk)
+            deltas[tag_id] -= 1
+    dates = {post.pk: post.pub_date for post in posts}
+    new = [
+        PostTag(post_id=post_id, tag_id=tag_id, pub_date=dates[post_id])
+        for post_id, tag_set in wanted.items() for tag_id in tag_set
+    ]
+    for post_tag in new:
+        deltas[post_tag.tag_id] += 1
+    with transaction.atomic():
+        PostTag.objects.filter(pk__in=stale).delete()
+        PostTag.objects.bulk_create(new)
+        change_counts(deltas)
+
+
+def cloud():
+    """TAG_CLOUD_SIZE самых частых тегов по алфавиту, с размером шрифта.
+
+    Размер от 1 до 2 em растёт с логарифмом числа постов.
+    """
+    tags = list(Tag.objects.filter(posts_count__gt=0).order_by(
+        '-posts_count'
+    )[:settings.TAG_CLOUD_SIZE])
+    if not tags:
+        return []
+    low = math.log(tags[-1].posts_count)
+    high = math.log(tags[0].posts_count)
+    for tag in tags:
+        share = (math.log(tag.posts_count) - low) / (high - low or 1)
+        tag.size = round(1 + share, 2)
+    return sorted(tags, key=lambda tag: tag.name)
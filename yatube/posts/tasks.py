@@ -0,0 +1,71 @@
+from django.conf import settings
+
+from core.images import cached_variants
+from jobs.queue import enqueue, task
+
+from . import notifications, purge, suggestions, trending
+from .models import Post, PostEvent
+
+
+@task(queue='media')
+def warm_thumbnails(post_id):
+    """Заранее создаёт все варианты картинки для {% responsive_image %}."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    cached_variants(post.image)
+
+
+@task()
+def refresh_trending():
+    """Пересчитывает рейтинг и ставит следующий пересчёт в очередь."""
+    trending.refresh()
+    enqueue(refresh_trending, delay=settings.TRENDING_REFRESH_INTERVAL,
+            idempotency_key='refresh_trending')
+
+
+@task()
+def refresh_suggestions():
+    """Пересчитывает рекомендации подписок и ставит следующий пересчёт."""
+    suggestions.refresh()
+    enqueue(refresh_suggestions,
+            delay=settings.SUGGESTIONS_REFRESH_INTERVAL,
+            idempotency_key='refresh_suggestions')
+
+
+@task()
+def notify_followers(event_id, after_user_id=0):
+    """Уведомляет одну порцию подписчиков и ставит в очередь следующую."""
+    event = PostEvent.objects.select_related('post').filter(
+        pk=event_id
+    ).first()
+    if event is None:
+        return
+    last_user_id = notifications.notify_chunk(event, after_user_id)
+    if last_user_id is not None:
+        enqueue(notify_followers, (event_id, last_user_id),
+                idempotency_key=f'notify:{event_id}:{last_user_id}')
+
+
+@task()
+def send_digests():
+    """Рассылает письма-сводки и ставит следующую рассылку в очередь."""
+    notifications.send_digests()
+    enqueue(send_digests, delay=settings.NOTIFICATIONS_DIGEST_INTERVAL,
+            idempotency_key='send_digests')
+
+
+@task()
+def purge_user(user_id):
+    """Удаляет порцию данных скрытого пользователя и ставит следующую."""
+    if not purge.purge_user_chunk(user_id):
+        enqueue(purge_user, (user_id,),
+                idempotency_key=f'purge_user:{user_id}')
+
+
+@task()
+def purge_group(group_id):
+    """Отвязывает порцию постов от скрытой группы и ставит следующую."""
+    if not purge.purge_group_chunk(group_id):
+        enqueue(purge_group, (group_id,),
+                idempotency_key=f'purge_group:{group_id}')
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..counters import ViewCounter, view_counter
+from ..models import Post
+
+User = get_user_model()
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post0 = Post.objects.create(text='Первый пост', author=cls.user)
+        cls.post1 = Post.objects.create(text='Второй пост', author=cls.user)
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=3600)
+    def test_hits_are_buffered_until_flush(self):
+        """Просмотры не пишутся в БД до сброса буфера."""
+        counter = ViewCounter()
+        for _ in range(3):
+            counter.hit(self.post0.pk)
+        counter.hit(self.post1.pk)
+        self.post0.refresh_from_db()
+        self.assertEqual(self.post0.views, 0)
+        self.assertEqual(counter.pending_for(self.post0.pk), 3)
+
+        with self.assertNumQueries(1):
+            counter.flush()
+        self.post0.refresh_from_db()
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post0.views, 3)
+        self.assertEqual(self.post1.views, 1)
+        self.assertEqual(counter.pending_for(self.post0.pk), 0)
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=3600)
+    def test_post_detail_shows_pending_views(self):
+        """Страница поста учитывает ещё не записанные просмотры."""
+        view_counter.flush()
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post1.pk})
+        self.client.force_login(self.user)
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.context['views'], 2)
+        view_counter.flush()
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=3600)
+    def test_cached_page_counts_views(self):
+        """Просмотр засчитывается и при отдаче страницы из кэша."""
+        view_counter.flush()
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post0.pk})
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(view_counter.pending_for(self.post0.pk), 2)
+        view_counter.flush()
+
+    @override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+    def test_failed_flush_keeps_unwritten_batches(self):
+        """Ошибка БД уходит в лог, и повторно пишутся только незаписанные."""
+        counter = ViewCounter()
+        counter.pending.update({self.post0.pk: 2, self.post1.pk: 3})
+        write = counter.write
+        calls = []
+
+        def flaky_write(items):
+            calls.append(items)
+            if len(calls) == 2:
+                raise OperationalError('database is locked')
+            write(items)
+
+        with mock.patch('posts.counters.FLUSH_BATCH_SIZE', 1), \
+                mock.patch.object(counter, 'write', flaky_write), \
+                self.assertLogs('posts.counters', 'ERROR'):
+            counter.flush_due()
+        self.assertEqual(dict(counter.pending), dict(calls[1]))
+        counter.flush()
+        self.post0.refresh_from_db()
+        self.post1.refresh_from_db()
+        self.assertEqual((self.post0.views, self.post1.views), (2, 3))
@@ -0,0 +1,108 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ProfileExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.other = User.objects.create_user(username='OtherUser')
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            text='Пост для выгрузки',
+            author=cls.user,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=small_gif,
+                content_type='image/gif'
+            )
+        )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Свой комментарий'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.user)
+        self.url = reverse(
+            'posts:profile_export', kwargs={'username': self.user.username}
+        )
+
+    def test_ndjson_export_streams_posts_and_comments(self):
+        """Выгрузка NDJSON содержит только записи автора."""
+        response = self.authorized_user.get(self.url)
+        self.assertTrue(response.streaming)
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [(record['type'], record['text']) for record in records],
+            [('post', 'Пост для выгрузки'), ('comment', 'Свой комментарий')]
+        )
+
+    def test_zip_export_contains_images(self):
+        """Zip-архив содержит выгрузку и картинки постов."""
+        response = self.authorized_user.get(self.url + '?format=zip')
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertEqual(
+            archive.namelist(),
+            ['posts.ndjson', f'images/{self.post.image.name}']
+        )
+        self.assertIsNone(archive.testzip())
+
+    def test_zip_export_shared_image_once(self):
+        """Общая для нескольких постов картинка попадает в архив один раз."""
+        Post.objects.create(
+            text='Пост с той же картинкой',
+            author=self.user,
+            image=self.post.image.name
+        )
+        response = self.authorized_user.get(self.url + '?format=zip')
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertEqual(
+            archive.namelist(),
+            ['posts.ndjson', f'images/{self.post.image.name}']
+        )
+
+    def test_export_forbidden_for_other_users(self):
+        """Выгрузить чужие данные нельзя."""
+        client = Client()
+        client.force_login(self.other)
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import follows
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowSetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(text=f'Пост {author.username}', author=author)
+        Follow.objects.create(user=cls.reader, author=cls.authors[0])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_reset_on_change(self):
+        """Подписка и отписка сбрасывают набор, он перечитывается раз."""
+        self.assertEqual(
+            follows.author_ids(self.reader.pk), (self.authors[0].pk,)
+        )
+        self.client.get(
+            reverse('posts:profile_follow', args=('author2',))
+        )
+        self.client.get(
+            reverse('posts:profile_unfollow', args=('author0',))
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                follows.author_ids(self.reader.pk), (self.authors[2].pk,)
+            )
+        with self.assertNumQueries(0):
+            follows.author_ids(self.reader.pk)
+
+    def test_repeated_follow_repairs_stale_set(self):
+        """Повторная подписка исправляет разошедшийся с БД набор."""
+        cache.set(follows.follows_key(self.reader.pk), ())
+        self.client.get(
+            reverse('posts:profile_follow', args=('author0',))
+        )
+        self.assertEqual(
+            follows.author_ids(self.reader.pk), (self.authors[0].pk,)
+        )
+
+    def test_feed_cards_without_follow_queries(self):
+        """Кнопки подписки на всех карточках не запрашивают подписки."""
+        follows.author_ids(self.reader.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        self.assertFalse([
+            query for query in queries if 'posts_follow' in query['sql']
+        ])
+        content = response.content.decode()
+        self.assertEqual(content.count('>Отписаться</a>'), 1)
+        self.assertEqual(content.count('>Подписаться</a>'), 2)
+
+    def test_cached_page_shows_reader_state(self):
+        """Страница из кэша показывает подписки вошедшего читателя."""
+        self.client.logout()
+        self.client.get(reverse('posts:profile', args=('author0',)))
+        self.client.force_login(self.reader)
+        response = self.client.get(
+            reverse('posts:profile', args=('author0',))
+        )
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Отписаться')
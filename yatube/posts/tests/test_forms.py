@@ -3,10 +3,14 @@ import tempfile
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
 from django.urls import reverse
 
+from core.models import StoredFile
+
 from ..forms import PostForm
 from ..models import Comment, Group, Post
 
@@ -176,3 +180,31 @@ class PostFormTests(TestCase):
         # проверка того, что текст добавленного комментария соответствует
         # отправленному в форме
         self.assertEqual(comment.text, comment_form_data['text'])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageReferenceTests(TransactionTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_reupload_on_edit_keeps_one_reference(self):
+        """Повторная загрузка той же картинки не копит ссылки."""
+        gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00\x01\x00\x80\x00\x00\x00'
+            b'\x00\x00\xFF\xFF\xFF\x21\xF9\x04\x00\x00\x00\x00\x00\x2C'
+            b'\x00\x00\x00\x00\x02\x00\x01\x00\x00\x02\x02\x0C\x0A\x00\x3B'
+        )
+        user = User.objects.create_user(username='testuser1')
+        post = Post.objects.create(
+            text='Пост', author=user,
+            image=SimpleUploadedFile('small.gif', gif)
+        )
+        # Та же картинка под уже сохранённым именем
+        post.image = ContentFile(gif, name=post.image.name)
+        post.save()
+        self.assertEqual(StoredFile.objects.get(pk=post.image.name).refs, 1)
+        post.delete()
+        self.assertFalse(StoredFile.objects.exists())
@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {i}', author=cls.author)
+            for i in range(15)
+        ]
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.user)
+
+    def posts_in(self, response):
+        return [
+            post for post in self.posts
+            if f'/posts/{post.pk}/"' in response.content.decode()
+        ]
+
+    def test_index_links_to_next_fragment(self):
+        """Лента продолжается фрагментом с курсором после страницы."""
+        response = self.client.get(reverse('posts:index'))
+        more_url = response.context['more_url']
+        self.assertContains(response, f'data-more="{more_url}"')
+        fragment = self.client.get(more_url)
+        self.assertNotContains(fragment, '<html')
+        self.assertEqual(len(self.posts_in(fragment)), 5)
+        self.assertNotContains(fragment, 'data-more')
+
+    def test_fragments_for_every_feed(self):
+        """Фрагменты группы, профиля, подписок и комментариев отвечают."""
+        post = self.posts[0]
+        Comment.objects.create(post=post, author=self.user, text='Коммент')
+        urls = (
+            reverse('posts:profile_fragment', args=(self.author.username,)),
+            reverse('posts:follow_fragment'),
+            reverse('posts:comments_fragment', args=(post.pk,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_user.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('ETag'))
+        response = self.client.get(
+            reverse('posts:group_fragment', args=('missing',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304."""
+        url = reverse('posts:index_fragment')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_etag_changes_on_unfollow(self):
+        """ETag ленты подписок меняется после отписки."""
+        url = reverse('posts:follow_fragment')
+        etag = self.authorized_user.get(url)['ETag']
+        Follow.objects.filter(user=self.user).delete()
+        response = self.authorized_user.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.posts_in(response), [])
+
+    def test_comments_continue_without_js(self):
+        """Следующие комментарии открываются и обычной ссылкой."""
+        post = self.posts[0]
+        for i in range(12):
+            Comment.objects.create(post=post, author=self.user, text=f'К{i}')
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        next_url = '{}?after={}'.format(
+            reverse('posts:post_detail', args=(post.pk,)),
+            response.context['cursor']
+        )
+        self.assertContains(response, f'href="{next_url}"')
+        response = self.client.get(next_url)
+        self.assertContains(response, '<p>К1</p>')
+        self.assertNotContains(response, '<p>К11</p>')
+        self.assertNotContains(response, 'data-more')
@@ -0,0 +1,105 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.models import StoredFile
+
+from ..importing import Importer
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C\x0A\x00\x3B'
+)
+
+
+class ImporterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+
+    def run_import(self, rows, **kwargs):
+        importer = Importer(batch_size=2, **kwargs)
+        importer.run(json.dumps(row, ensure_ascii=False) for row in rows)
+        return importer
+
+    def test_rows_are_imported_with_relations(self):
+        """Посты, комментарии и подписки связываются по внешним id."""
+        importer = self.run_import([
+            {'type': 'group', 'slug': 'cats', 'title': 'Коты',
+             'description': 'Про котов'},
+            {'type': 'post', 'id': 10, 'author': 'Newcomer', 'group': 'cats',
+             'text': 'Первый пост', 'date': '2020-01-02T03:04:05+00:00'},
+            {'type': 'post', 'id': 11, 'text': 'Второй пост'},
+            {'type': 'comment', 'post_id': 10, 'text': 'Комментарий'},
+            {'type': 'follow', 'user': 'TestUser', 'author': 'Newcomer'},
+        ], create_users=True, default_author='TestUser')
+        self.assertEqual(importer.errors, [])
+
+        newcomer = User.objects.get(username='Newcomer')
+        post = Post.objects.get(text='Первый пост')
+        self.assertEqual(post.author, newcomer)
+        self.assertEqual(post.group, Group.objects.get(slug='cats'))
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(Post.objects.get(text='Второй пост').author,
+                         self.user)
+        self.assertEqual(Comment.objects.get().post, post)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=newcomer).exists()
+        )
+
+    def test_invalid_rows_are_skipped(self):
+        """Строки, не прошедшие проверку формы, пропускаются."""
+        importer = self.run_import([
+            {'type': 'post', 'author': 'TestUser', 'text': ''},
+            {'type': 'post', 'author': 'Nobody', 'text': 'Текст'},
+            {'type': 'comment', 'post_id': 999, 'text': 'Текст'},
+            {'type': 'post', 'author': 'TestUser', 'text': 'Текст'},
+        ])
+        self.assertEqual([number for number, _ in importer.errors], [1, 2, 3])
+        self.assertEqual(Post.objects.count(), 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImportedImageTests(TransactionTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_imported_post_holds_image_reference(self):
+        """Импортированный пост берёт ссылку на файл и его размеры."""
+        user = User.objects.create_user(username='TestUser')
+        post = Post.objects.create(
+            text='Исходный пост', author=user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF)
+        )
+        name = post.image.name
+        importer = Importer()
+        importer.run([
+            json.dumps({'type': 'post', 'author': 'TestUser',
+                        'text': 'Копия', 'image': name}),
+            json.dumps({'type': 'post', 'author': 'TestUser',
+                        'text': 'Чужой файл', 'image': 'posts/other.gif'}),
+        ])
+        self.assertEqual([number for number, _ in importer.errors], [2])
+        imported = Post.objects.get(text='Копия')
+        self.assertEqual((imported.image_width, imported.image_height),
+                         (2, 1))
+        self.assertEqual(StoredFile.objects.get(pk=name).refs, 2)
+
+        imported.delete()
+        self.assertEqual(StoredFile.objects.get(pk=name).refs, 1)
+        self.assertTrue(post.image.storage.exists(name))
@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import views
+
+from ..models import Group
+
+User = get_user_model()
+
+
+class LookupCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_missing_user_cached(self):
+        """Повторный запрос несуществующего профиля не идёт в БД."""
+        url = reverse('posts:profile', kwargs={'username': 'nobody'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_created_user_replaces_missing_entry(self):
+        """Новый пользователь доступен сразу, несмотря на кэш промаха."""
+        url = reverse('posts:profile', kwargs={'username': 'newcomer'})
+        self.client.get(url)
+        User.objects.create_user(username='newcomer')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_renamed_group_forgotten(self):
+        """После смены slug старый адрес группы отдаёт 404."""
+        old_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.assertEqual(self.client.get(old_url).status_code, 200)
+        self.group.slug = 'renamed'
+        self.group.save()
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        new_url = reverse('posts:group_list', kwargs={'slug': 'renamed'})
+        self.assertEqual(self.client.get(new_url).status_code, 200)
+
+    def test_not_found_page_shows_escaped_path(self):
+        """Заготовка страницы 404 получает экранированный адрес."""
+        response = self.client.get('/missing/<b>/')
+        self.assertEqual(response.status_code, 404)
+        self.assertContains(response, '/missing/&lt;b&gt;/', status_code=404)
+        response = self.client.get('/other/')
+        self.assertContains(response, '/other/', status_code=404)
+
+    def test_not_found_page_rerendered_next_year(self):
+        """Заготовка 404 перерисовывается с новым годом в подвале."""
+        now = timezone.now()
+        with mock.patch('core.views.not_found_page', (None, '')):
+            response = self.client.get('/missing/')
+            self.assertContains(response, 'Войти', status_code=404)
+            self.assertEqual(views.not_found_page[0], now.year)
+            with mock.patch(
+                'core.views.timezone.now',
+                return_value=now + timedelta(days=366)
+            ):
+                self.client.get('/missing/')
+            self.assertEqual(views.not_found_page[0], now.year + 1)
@@ -0,0 +1,100 @@
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import markup
+from ..forms import CommentForm
+from ..models import TEXT_MAX_LENGTH, Comment, Post
+
+User = get_user_model()
+
+
+class RenderTests(SimpleTestCase):
+
+    def test_html_escaped(self):
+        """Разметка пользователя не попадает в страницу как есть."""
+        self.assertEqual(
+            markup.render('<script>alert(1)</script> `<b>`'),
+            '<p>&lt;script&gt;alert(1)&lt;/script&gt; '
+            '<code>&lt;b&gt;</code></p>'
+        )
+
+    def test_blocks(self):
+        """Абзацы, переносы, цитаты, списки и блоки кода."""
+        self.assertEqual(
+            markup.render('раз\nдва\n\n> цитата\n- пункт\n```\n**x**\n```'),
+            '<p>раз<br>два</p>\n'
+            '<blockquote><p>цитата</p></blockquote>\n'
+            '<ul><li>пункт</li></ul>\n'
+            '<pre><code>**x**</code></pre>'
+        )
+
+    def test_links_and_mentions(self):
+        """Ссылки только http(s), упоминания ведут в профиль."""
+        html = markup.render(
+            '**см.** https://ya.ru/?a=1&b=2, [тут](javascript:alert(1)) '
+            'и @leo; почта a@b.ru'
+        )
+        self.assertIn('<strong>см.</strong>', html)
+        self.assertIn(
+            '<a href="https://ya.ru/?a=1&amp;b=2" rel="nofollow noopener">',
+            html
+        )
+        self.assertNotIn('href="javascript', html)
+        self.assertIn(
+            f'<a href="{reverse("posts:profile", args=("leo",))}">@leo</a>',
+            html
+        )
+        self.assertNotIn('b.ru</a>', html)
+
+    def test_unclosed_markers_linear(self):
+        """Незакрытые маркеры текста предельной длины разбираются быстро."""
+        for marker in ('*a ', '**a ', '_a ', '[a'):
+            text = marker * (TEXT_MAX_LENGTH // len(marker))
+            started = time.perf_counter()
+            markup.render(text)
+            self.assertLess(time.perf_counter() - started, 0.5, marker)
+        self.assertFalse(
+            CommentForm({'text': 'a' * (TEXT_MAX_LENGTH + 1)}).is_valid()
+        )
+
+
+class StoredHtmlTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(text='*Пост*', author=cls.user)
+
+    def test_html_built_on_save(self):
+        """HTML текста строится при сохранении поста и комментария."""
+        self.assertEqual(self.post.text_html, '<p><em>Пост</em></p>')
+        self.assertEqual(self.post.text_html_version, markup.VERSION)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='**да**'
+        )
+        self.assertEqual(comment.text_html, '<p><strong>да</strong></p>')
+
+    def test_feed_outputs_stored_html(self):
+        """Страница поста выводит сохранённый HTML."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertContains(response, '<p><em>Пост</em></p>')
+
+    def test_rerender_outdated(self):
+        """rerender_text перестраивает только устаревшие тексты."""
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='', text_html_version=0
+        )
+        output = StringIO()
+        call_command('rerender_text', '--batch-size', '1', stdout=output)
+        self.assertIn('Посты: 1', output.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p><em>Пост</em></p>')
+        call_command('rerender_text', stdout=output)
+        self.assertIn('Посты: 0', output.getvalue())
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import minhash
+from ..models import Post, SignatureBand
+
+User = get_user_model()
+
+SPAM = ('Купите наши чудесные часы со скидкой прямо сейчас, доставка по '
+        'всей стране бесплатно, пишите в личные сообщения и получите '
+        'подарок каждому покупателю сегодня')
+VARIANT = SPAM.replace('сейчас', 'сегодня') + '!!!'
+OTHER = ('Сегодня гуляли в парке с собакой, погода была прекрасная, '
+         'листья уже пожелтели, а вечером пили чай с вареньем')
+
+
+class SignatureTests(SimpleTestCase):
+
+    def test_similarity(self):
+        """Подписи вариантов одного текста похожи, разных - нет."""
+        spam = minhash.signature(SPAM)
+        self.assertGreater(
+            minhash.similarity(spam, minhash.signature(VARIANT)), 0.6
+        )
+        self.assertLess(
+            minhash.similarity(spam, minhash.signature(OTHER)), 0.2
+        )
+        self.assertIsNone(minhash.signature('Короткий пост'))
+
+
+class DuplicatePostTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Spammer')
+        cls.post = Post.objects.create(text=SPAM, author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, text):
+        return self.client.post(reverse('posts:create_post'), {'text': text})
+
+    def test_bands_indexed_on_save(self):
+        """При сохранении поста записываются полосы его подписи."""
+        self.assertEqual(
+            SignatureBand.objects.filter(post=self.post).count(),
+            minhash.BANDS
+        )
+
+    def test_near_duplicate_rejected(self):
+        """Почти такой же пост не проходит проверку формы одним запросом."""
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                minhash.near_duplicates(minhash.signature(VARIANT)),
+                [self.post.pk]
+            )
+        response = self.create(VARIANT)
+        self.assertFormError(
+            response, 'form', 'text', 'Почти такой же пост уже опубликован'
+        )
+        self.create(OTHER)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_edit_not_compared_with_itself(self):
+        """Правка поста не считается повтором его самого."""
+        self.client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            {'text': VARIANT}
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, VARIANT)
+
+    @override_settings(DUPLICATE_POST_ACTION='flag')
+    def test_near_duplicate_flagged(self):
+        """В режиме flag повтор сохраняется с пометкой."""
+        self.create(VARIANT)
+        self.assertTrue(Post.objects.get(text=VARIANT).is_duplicate)
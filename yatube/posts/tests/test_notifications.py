@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.worker import Worker
+
+from ..models import Follow, Notification, PostEvent
+from ..notifications import send_digests, unread_count
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATIONS_CHUNK_SIZE=2, JOBS_QUEUES={'default': 10})
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.other = User.objects.create_user(username='OtherAuthor')
+        cls.followers = [
+            User.objects.create_user(
+                username=f'follower{i}', email=f'follower{i}@yatube.ru'
+            )
+            for i in range(5)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=user, author=cls.author) for user in cls.followers
+        )
+        Follow.objects.create(user=cls.followers[0], author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader = self.followers[0]
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def publish(self, client=None, text='Новый пост'):
+        (client or self.author_client).post(
+            reverse('posts:create_post'), {'text': text}
+        )
+        worker = Worker(threads=0)
+        while worker.run_once():
+            pass
+
+    def test_post_create_defers_fan_out(self):
+        """Создание поста только записывает событие и ставит задачу."""
+        self.author_client.post(
+            reverse('posts:create_post'), {'text': 'Новый пост'}
+        )
+        self.assertEqual(PostEvent.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(
+            Job.objects.filter(status=Job.QUEUED).count(), 1
+        )
+
+    def test_fan_out_in_chunks(self):
+        """Все подписчики уведомлены цепочкой задач по порциям."""
+        self.publish()
+        event = PostEvent.objects.get()
+        self.assertEqual(event.notified, 5)
+        self.assertIsNotNone(event.finished)
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(
+            Job.objects.filter(task__endswith='notify_followers').count(), 3
+        )
+
+    def test_posts_collapse_into_digest(self):
+        """Непрочитанные посты одного автора собираются в одну сводку."""
+        self.publish(text='Первый')
+        self.publish(text='Второй')
+        other_client = Client()
+        other_client.force_login(self.other)
+        self.publish(other_client)
+        self.assertEqual(
+            Notification.objects.filter(user=self.reader).count(), 2
+        )
+        self.assertEqual(unread_count(self.reader), 3)
+        latest = Notification.objects.get(
+            user=self.reader, author=self.author
+        )
+        self.assertEqual(latest.count, 2)
+        self.assertEqual(latest.post.text, 'Второй')
+
+    def test_notifications_page_marks_read(self):
+        """Страница уведомлений показывает их и отмечает прочитанными."""
+        self.publish()
+        response = self.reader_client.get(reverse('posts:index'))
+        self.assertContains(response, 'badge-pill badge-primary">1<')
+        response = self.reader_client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'новое')
+        self.assertEqual(unread_count(self.reader), 0)
+        self.publish()
+        self.assertEqual(
+            Notification.objects.filter(user=self.reader).count(), 2
+        )
+
+    def test_email_digest(self):
+        """Каждый подписчик получает одно письмо со всеми сводками."""
+        self.publish(text='Первый')
+        self.publish(text='Второй')
+        self.assertEqual(send_digests(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertIn('TestAuthor: 2', mail.outbox[0].body)
+        self.assertEqual(send_digests(), 0)
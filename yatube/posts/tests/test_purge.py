@@ -0,0 +1,129 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.worker import Worker
+
+from ..models import Comment, Follow, FollowSuggestion, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PURGE_CHUNK_SIZE=2, JOBS_QUEUES={'default': 10})
+class SoftDeleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='pass'
+        )
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+        self.author = User.objects.create_user(username='Spammer')
+        self.reader = User.objects.create_user(username='Reader')
+        self.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        self.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=self.author, group=self.group
+            )
+            for i in range(5)
+        ]
+        self.reader_post = Post.objects.create(
+            text='Пост читателя', author=self.reader, group=self.group
+        )
+        for post in self.posts[:3]:
+            Comment.objects.create(post=post, author=self.reader, text='Да')
+        Comment.objects.create(
+            post=self.reader_post, author=self.author, text='Спам'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        FollowSuggestion.objects.create(
+            user=self.reader, author=self.author, score=1
+        )
+        FollowSuggestion.objects.create(
+            user=self.author, author=self.reader, score=1
+        )
+
+    def run_jobs(self):
+        worker = Worker(threads=0)
+        while worker.run_once():
+            pass
+
+    def test_deleted_user_hidden_immediately(self):
+        """Удалённый из админки пользователь сразу пропадает с сайта."""
+        self.admin_client.post(
+            reverse('admin:auth_user_delete', args=(self.author.pk,)),
+            {'post': 'yes'}
+        )
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.is_active)
+        self.assertEqual(
+            Job.objects.filter(task__endswith='purge_user').count(), 1
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            list(response.context['page_obj']), [self.reader_post]
+        )
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.posts[0].pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.reader_post.pk,))
+        )
+        self.assertEqual(list(response.context['comments']), [])
+
+    def test_user_purged_in_chunks(self):
+        """Записи пользователя удаляются цепочкой задач по порциям."""
+        self.admin_client.post(
+            reverse('admin:auth_user_delete', args=(self.author.pk,)),
+            {'post': 'yes'}
+        )
+        self.run_jobs()
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(list(Post.objects.all()), [self.reader_post])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(FollowSuggestion.objects.exists())
+        self.assertGreater(
+            Job.objects.filter(task__endswith='purge_user').count(), 3
+        )
+
+    def test_restored_user_not_purged(self):
+        """Восстановленного до очистки пользователя задача не трогает."""
+        self.admin_client.post(
+            reverse('admin:auth_user_delete', args=(self.author.pk,)),
+            {'post': 'yes'}
+        )
+        self.admin_client.post(
+            reverse(
+                'admin:posts_deleteduser_delete', args=(self.author.pk,)
+            ),
+            {'post': 'yes'}
+        )
+        self.run_jobs()
+        self.assertEqual(self.author.posts.count(), 5)
+
+    def test_group_hidden_and_purged(self):
+        """Группа скрывается сразу, посты отвязываются фоновой задачей."""
+        self.admin_client.post(
+            reverse('admin:posts_group_delete', args=(self.group.pk,)),
+            {'post': 'yes'}
+        )
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,))
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 6)
+        self.run_jobs()
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 6)
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post
+from ..stream import Hub
+
+User = get_user_model()
+
+
+@override_settings(SSE_POLL_INTERVAL=0, SSE_COMMIT_GRACE=0)
+class StreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.author = User.objects.create_user(username='TestAuthor')
+        cls.stranger = User.objects.create_user(username='Stranger')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.hub = Hub(3)
+        patcher = mock.patch('posts.stream.hub', self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.authorized_user = Client()
+        self.authorized_user.force_login(self.user)
+
+    def read(self, client, url, last_id):
+        response = client.get(url, HTTP_LAST_EVENT_ID=str(last_id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response.content.decode()
+
+    def test_stream_sends_new_posts(self):
+        """Поток отдаёт посты новее Last-Event-ID."""
+        first = Post.objects.create(text='Первый', author=self.author)
+        second = Post.objects.create(text='Второй', author=self.stranger)
+        content = self.read(self.client, reverse('posts:stream'), first.pk)
+        self.assertIn(f'"id": {second.pk},', content)
+        self.assertNotIn(f'"id": {first.pk},', content)
+        self.assertTrue(content.startswith('retry: '))
+        self.assertTrue(content.endswith(f'id: {second.pk}\n\n'))
+
+    def test_first_request_returns_current_id(self):
+        """Без Last-Event-ID ответ сразу сообщает, откуда продолжить."""
+        post = Post.objects.create(text='Старый', author=self.author)
+        response = self.client.get(reverse('posts:stream'))
+        self.assertFalse(response.streaming)
+        self.assertEqual(
+            response.content.decode(), f'retry: 3000\n\nid: {post.pk}\n\n'
+        )
+
+    def test_follow_stream_filters_authors(self):
+        """В потоке подписок только посты авторов из подписок."""
+        followed = Post.objects.create(text='Свой', author=self.author)
+        other = Post.objects.create(text='Чужой', author=self.stranger)
+        content = self.read(
+            self.authorized_user, reverse('posts:follow_stream'), 0
+        )
+        self.assertIn(f'"id": {followed.pk},', content)
+        self.assertNotIn(f'"id": {other.pk},', content)
+
+    def test_hub_falls_back_to_db_after_overflow(self):
+        """Вытесненные из памяти посты берутся из БД."""
+        self.hub.start()
+        posts = [
+            Post.objects.create(text=str(i), author=self.author)
+            for i in range(5)
+        ]
+        self.hub.publish()
+        self.hub.publish()
+        self.assertEqual(
+            [pk for pk, _ in self.hub.since(posts[2].pk)],
+            [posts[3].pk, posts[4].pk]
+        )
+        self.assertEqual(
+            [pk for pk, _ in self.hub.since(posts[0].pk)],
+            [posts[1].pk, posts[2].pk, posts[3].pk]
+        )
+
+    def test_hub_picks_up_late_commits(self):
+        """Пост, закоммиченный позже поста с большим id, не теряется."""
+        self.hub.start()
+        base = self.hub.safe_id
+        later = Post.objects.create(
+            pk=base + 2, text='Позже', author=self.author
+        )
+        with override_settings(SSE_COMMIT_GRACE=60):
+            self.hub.publish()
+            self.assertEqual(self.hub.safe_id, base)
+            earlier = Post.objects.create(
+                pk=base + 1, text='Раньше', author=self.author
+            )
+            self.hub.publish()
+            self.assertEqual(
+                [pk for pk, _ in self.hub.since(base)],
+                [earlier.pk, later.pk]
+            )
+            content = self.read(self.client, reverse('posts:stream'), base)
+        self.assertIn(f'"id": {earlier.pk},', content)
+        self.assertTrue(content.endswith(f'id: {base}\n\n'))
+        self.hub.publish()
+        self.assertEqual(self.hub.safe_id, later.pk)
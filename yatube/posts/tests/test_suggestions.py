@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import suggestions
+from ..models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+class SuggestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'carol', 'dave', 'eve', 'frank')
+        }
+        for user, author in (
+            ('reader', 'friend'), ('friend', 'carol'), ('friend', 'dave'),
+            ('eve', 'friend'), ('eve', 'dave'), ('eve', 'frank'),
+        ):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.users['reader'])
+
+    def suggested(self, name):
+        return list(FollowSuggestion.objects.filter(
+            user=self.users[name]
+        ).values_list('author__username', flat=True))
+
+    def test_scores(self):
+        """Друзья друзей и авторы похожих читателей, без своих подписок."""
+        call_command('refresh_suggestions', stdout=StringIO())
+        self.assertEqual(self.suggested('reader'), ['dave', 'carol', 'frank'])
+        # Без подписок предлагаются самые читаемые авторы
+        self.assertEqual(set(self.suggested('carol')[:2]), {'dave', 'friend'})
+
+    def test_refresh_replaces_old_rows(self):
+        """Повторный пересчёт заменяет рекомендации, а не дописывает."""
+        suggestions.refresh()
+        count = FollowSuggestion.objects.count()
+        suggestions.refresh()
+        self.assertEqual(FollowSuggestion.objects.count(), count)
+
+    def test_shown_on_follow_page(self):
+        """Лента подписок показывает рекомендации без уже подписанных."""
+        suggestions.refresh()
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Возможно, вам будет интересно')
+        self.assertContains(response, '>dave</a>')
+        self.client.get(reverse('posts:profile_follow', args=('dave',)))
+        response = self.client.get(
+            reverse('posts:profile', args=('carol',))
+        )
+        self.assertNotContains(response, '>dave</a>')
+        self.assertContains(response, '>frank</a>')
@@ -0,0 +1,94 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .. import markup, tags
+from ..importing import Importer
+from ..models import Post, PostTag, Tag
+
+User = get_user_model()
+
+
+class ExtractTests(SimpleTestCase):
+
+    def test_extract(self):
+        """Хештеги без цифровых, якорей ссылок и HTML-сущностей."""
+        self.assertEqual(
+            tags.extract(
+                '#Django и #джанго_2, не #123, https://ya.ru/#top, &#39; '
+                'и снова #django'
+            ),
+            {'django', 'джанго_2'}
+        )
+
+    def test_hashtag_linked(self):
+        """В HTML текста хештег ведёт на ленту тега."""
+        self.assertIn(
+            f'<a href="{reverse("posts:tag_posts", args=("кот",))}">#Кот</a>',
+            markup.render('#Кот')
+        )
+
+
+class TagIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        return dict(Tag.objects.values_list('name', 'posts_count'))
+
+    def test_tags_follow_post_text(self):
+        """Теги и их счётчики обновляются при создании, правке и удалении."""
+        first = Post.objects.create(text='#кот и #пёс', author=self.user)
+        Post.objects.create(text='Снова #кот', author=self.user)
+        self.assertEqual(self.counts(), {'кот': 2, 'пёс': 1})
+        first.text = 'Только #пёс и #ёж'
+        first.save()
+        self.assertEqual(self.counts(), {'кот': 1, 'пёс': 1, 'ёж': 1})
+        first.delete()
+        self.assertEqual(self.counts(), {'кот': 1, 'пёс': 0, 'ёж': 0})
+        self.assertEqual(PostTag.objects.count(), 1)
+
+    def test_tag_feed(self):
+        """Лента тега использует шаблон группы и идёт от новых к старым."""
+        old = Post.objects.create(text='#кот', author=self.user)
+        new = Post.objects.create(text='#Кот', author=self.user)
+        Post.objects.create(text='без тегов', author=self.user)
+        response = self.client.get(
+            reverse('posts:tag_posts', args=('КОТ',))
+        )
+        self.assertTemplateUsed(response, 'posts/group_list.html')
+        self.assertEqual(list(response.context['page_obj']), [new, old])
+        self.assertContains(response, '<h1>#кот</h1>')
+        response = self.client.get(
+            reverse('posts:tag_posts', args=('нет',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_tag_cloud_cached(self):
+        """Облако строится из счётчиков и кэшируется."""
+        for text in ('#кот', '#кот', '#кот #пёс'):
+            Post.objects.create(text=text, author=self.user)
+        response = self.client.get(reverse('posts:tags'))
+        cloud = {tag.name: tag.size for tag in response.context['tags']}
+        self.assertEqual(cloud, {'кот': 2, 'пёс': 1})
+        with self.assertNumQueries(0):
+            self.client.get(reverse('posts:tags'))
+
+    def test_importer_indexes_tags(self):
+        """Импорт заполняет HTML текста и индекс тегов."""
+        importer = Importer(default_author='TestUser')
+        importer.run([json.dumps(
+            {'type': 'post', 'text': 'Импорт #кот'}, ensure_ascii=False
+        )])
+        post = Post.objects.get()
+        self.assertIn('#кот</a>', post.text_html)
+        self.assertEqual(self.counts(), {'кот': 1})
+        self.assertEqual(PostTag.objects.get().pub_date, post.pub_date)
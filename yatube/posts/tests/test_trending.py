@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import content_version
+
+from .. import trending
+from ..models import Comment, Post, PostRank
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.quiet = Post.objects.create(text='Тихий пост', author=cls.user)
+        cls.popular = Post.objects.create(
+            text='Обсуждаемый пост', author=cls.user
+        )
+        cls.old = Post.objects.create(text='Старый пост', author=cls.user)
+        Post.objects.filter(pk=cls.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.popular, author=cls.user, text='Комментарий')
+            for _ in range(3)
+        )
+
+    def test_refresh_ranks_recent_posts(self):
+        """Пересчёт ставит обсуждаемый пост выше и пропускает старые."""
+        self.assertEqual(trending.refresh(), 2)
+        ranked = list(PostRank.objects.values_list('post_id', flat=True))
+        self.assertEqual(ranked, [self.popular.pk, self.quiet.pk])
+
+    def test_trending_page_uses_ranking(self):
+        """Страница популярного выводит посты в порядке рейтинга."""
+        trending.refresh()
+        response = self.client.get(reverse('posts:trending'))
+        self.assertTemplateUsed(response, 'posts/trending.html')
+        posts = list(response.context['page_obj'])
+        self.assertEqual(posts, [self.popular, self.quiet])
+
+    def test_refresh_resets_only_trending_cache(self):
+        """Пересчёт обновляет страницу популярного, не сбрасывая весь кэш."""
+        cache.clear()
+        trending.refresh()
+        self.client.get(reverse('posts:trending'))
+        version = content_version()
+        Comment.objects.bulk_create(
+            Comment(post=self.quiet, author=self.user, text='Ещё')
+            for _ in range(5)
+        )
+        trending.refresh(timezone.now() + timedelta(seconds=1))
+        self.assertEqual(content_version(), version)
+        response = self.client.get(reverse('posts:trending'))
+        posts = list(response.context['page_obj'])
+        self.assertEqual(posts, [self.quiet, self.popular])
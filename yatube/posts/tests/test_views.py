@@ -7,7 +7,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ..models import Follow, Group, Post
@@ -126,18 +128,21 @@ class PostViewsTests(TestCase):
                     self.assertEqual(post.image, post_from_db.image)
 
     def test_index_page_caching(self):
-        """Проверка кэширования страницы 'index'"""
+        """Страница 'index' берётся из кэша, пока не изменился контент"""
         response = self.authorized_user.get(reverse('posts:index'))
         content_before = response.content
-        self.post3.delete()
-        response = self.authorized_user.get(reverse('posts:index'))
-        content_after = response.content
-        self.assertEqual(content_after, content_before)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_user.get(reverse('posts:index'))
+        self.assertEqual(response.content, content_before)
+        self.assertFalse([
+            query for query in queries if 'FROM "posts_post"' in query['sql']
+        ])
 
-        cache.clear()
+        self.post3.delete()
         response = self.authorized_user.get(reverse('posts:index'))
-        content_after = len(response.content)
-        self.assertNotEqual(content_after, content_before)
+        self.assertNotEqual(response.content, content_before)
+        response = self.authorized_user.get(reverse('posts:index') + '?page=x')
+        self.assertEqual(response.context['page_obj'].number, 1)
 
     def test_group_list_page_show_correct_context(self):
         """Шаблон 'group_list' сформирован с правильным контекстом."""
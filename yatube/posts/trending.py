@@ -0,0 +1,73 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Comment, Post, PostRank
+
+VERSION_KEY = 'trending_version'
+
+
+def score(comments, views, age_hours):
+    """Чем больше свежих комментариев и просмотров, тем выше пост;
+    с возрастом рейтинг затухает."""
+    weight = (
+        comments * settings.TRENDING_COMMENT_WEIGHT
+        + math.log1p(views) * settings.TRENDING_VIEW_WEIGHT
+        + 1
+    )
+    return weight / (age_hours + 2) ** settings.TRENDING_GRAVITY
+
+
+def version():
+    """Время последнего пересчёта; входит в ключ кэша страницы популярного.
+
+    Пересчёт меняет только рейтинг, поэтому общий content_version и
+    с ним кэш остальных страниц он не сбрасывает.
+    """
+    def computed_at():
+        last = PostRank.objects.values_list('computed_at', flat=True).first()
+        return last.timestamp() if last else 0
+    return cache.get_or_set(VERSION_KEY, computed_at, timeout=None)
+
+
+def refresh(now=None):
+    """Пересчитывает рейтинг постов за последние TRENDING_WINDOW_HOURS.
+
+    Обрабатываются только посты из окна и комментарии за последние
+    TRENDING_VELOCITY_HOURS, поэтому стоимость пересчёта не растёт
+    вместе с размером таблиц. Возвращает число посчитанных постов.
+    """
+    now = now or timezone.now()
+    window_start = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    velocity_start = now - timedelta(hours=settings.TRENDING_VELOCITY_HOURS)
+    recent_comments = dict(
+        Comment.objects.filter(
+            created__gte=velocity_start,
+            post__pub_date__gte=window_start
+        ).values_list('post').annotate(count=Count('pk')).order_by()
+    )
+    posts = Post.objects.filter(
+        pub_date__gte=window_start
+    ).values_list('pk', 'pub_date', 'views')
+    ranks = [
+        PostRank(
+            post_id=pk,
+            score=score(
+                recent_comments.get(pk, 0),
+                views,
+                (now - pub_date).total_seconds() / 3600
+            ),
+            computed_at=now
+        )
+        for pk, pub_date, views in posts.iterator()
+    ]
+    with transaction.atomic():
+        PostRank.objects.all().delete()
+        PostRank.objects.bulk_create(ranks, batch_size=500)
+    cache.set(VERSION_KEY, now.timestamp(), timeout=None)
+    return len(ranks)
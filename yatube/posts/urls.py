@@ -6,14 +6,25 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('stream/', views.stream, name='stream'),
+    path('trending/', views.trending, name='trending'),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
+    path('tag/<str:name>/', views.tag_posts, name='tag_posts'),
+    path('tags/', views.tag_cloud, name='tags'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='create_post'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('notifications/', views.notifications, name='notifications'),
+    path('follow/stream/', views.follow_stream, name='follow_stream'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -24,4 +35,25 @@ urlpatterns = [
         views.profile_unfollow,
         name="profile_unfollow"
     ),
+    path('fragments/index/', views.index_fragment, name='index_fragment'),
+    path(
+        'fragments/group/<slug:slug>/',
+        views.group_fragment,
+        name='group_fragment'
+    ),
+    path(
+        'fragments/profile/<str:username>/',
+        views.profile_fragment,
+        name='profile_fragment'
+    ),
+    path(
+        'fragments/follow/',
+        views.follow_fragment,
+        name='follow_fragment'
+    ),
+    path(
+        'fragments/posts/<int:post_id>/comments/',
+        views.comments_fragment,
+        name='comments_fragment'
+    ),
 ]
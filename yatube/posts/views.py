@@ -1,54 +1,231 @@
+from hashlib import md5
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.http import condition
+
+from core.cache import cached_page, content_version, get_or_compute
+from core.holes import fill_holes
+from core.pagination import encode_cursor, keyset_page
+from core.streaming import render_streaming, streaming_enabled
+from jobs.queue import enqueue
+
+from . import follows, tags
+from .counters import view_counter
+from .exports import FORMATS
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .lookups import get_group_or_404, get_user_id_or_404
+from .models import (Comment, Follow, Notification, Post, PostEvent, Tag,
+                     User)
+from .stream import event_batch, hub
+from .tasks import notify_followers, warm_thumbnails
+from .trending import version as trending_version
+
+
+def posts_count_for(author):
+    return get_or_compute(
+        f'posts_count:{content_version()}:{author.pk}',
+        Post.objects.filter(author=author).count,
+        timeout=settings.FEED_CACHE_TIMEOUT
+    )
+
+
+def more_url(name, page_obj, *args):
+    """Адрес фрагмента с продолжением ленты после текущей страницы."""
+    if not page_obj.has_next():
+        return None
+    cursor = encode_cursor(page_obj[len(page_obj) - 1], 'pub_date')
+    return f'{reverse(name, args=args)}?after={cursor}'
+
+
+def content_etag(request, *args, **kwargs):
+    return md5(
+        f'{content_version()}:{request.get_full_path()}'.encode()
+    ).hexdigest()
+
+
+def fragment_etag(request, *args, **kwargs):
+    # Кнопки подписки на карточках зависят ещё и от подписок читателя
+    return md5(
+        f'{content_etag(request)}:{follows.digest(request)}'.encode()
+    ).hexdigest()
+
+
+def render_fragment(request, key, queryset, template, field, **context):
+    """Порция ленты после курсора ?after= без обёртки страницы.
+
+    Отрисованный HTML кэшируется по key, поэтому прокрутка до уже
+    показанного кому-то места не трогает ни БД, ни шаблоны;
+    персональные фрагменты {% hole %} перерисовываются для читателя.
+    """
+    def compute():
+        objects, cursor = keyset_page(
+            queryset, request.GET.get('after'),
+            settings.POSTS_PER_PAGE, field
+        )
+        return render_to_string(template, {
+            **context,
+            'posts': objects,
+            'comments': objects,
+            'continued': True,
+            'cursor': cursor,
+            'more_url': cursor and f'{request.path}?after={cursor}',
+        }, request)
+    content = get_or_compute(
+        f'fragment:{key}', compute, timeout=settings.FEED_CACHE_TIMEOUT
+    )
+    return HttpResponse(fill_holes(content, request))
+
+
+@condition(etag_func=fragment_etag)
+def index_fragment(request):
+    return render_fragment(
+        request, content_etag(request),
+        Post.objects.visible().select_related('author', 'group'),
+        'posts/includes/post_list.html', 'pub_date'
+    )
+
+
+@condition(etag_func=fragment_etag)
+def group_fragment(request, slug):
+    return render_fragment(
+        request, content_etag(request),
+        get_group_or_404(slug).posts.visible().select_related(
+            'author', 'group'
+        ),
+        'posts/includes/post_list.html', 'pub_date'
+    )
+
+
+@condition(etag_func=fragment_etag)
+def profile_fragment(request, username):
+    return render_fragment(
+        request, content_etag(request),
+        Post.objects.filter(
+            author_id=get_user_id_or_404(username)
+        ).select_related('group'),
+        'posts/includes/post_list.html', 'pub_date', profile=True
+    )
+
+
+@login_required
+@condition(etag_func=fragment_etag)
+def follow_fragment(request):
+    # Состав ленты зависит от подписок, поэтому они входят и в ключ кэша
+    return render_fragment(
+        request, fragment_etag(request),
+        Post.objects.visible().filter(
+            author__following__user=request.user
+        ).select_related('author', 'group'),
+        'posts/includes/post_list.html', 'pub_date'
+    )
+
+
+@condition(etag_func=fragment_etag)
+def comments_fragment(request, post_id):
+    return render_fragment(
+        request, content_etag(request),
+        Comment.objects.visible().filter(
+            post_id=post_id
+        ).select_related('author'),
+        'posts/includes/comment_list.html', 'created', post_id=post_id
+    )
 
 
 def index(request):
     template = 'posts/index.html'
-    posts = cache.get('index_page')
-    if posts is None:
-        posts = Post.objects.select_related('group')
-        cache.set('index_page', posts, timeout=20)
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = cached_page(
+        f'index_page:{content_version()}',
+        Post.objects.visible().select_related('author', 'group'),
+        request.GET.get('page'),
+        timeout=settings.FEED_CACHE_TIMEOUT
+    )
     context = {
         'page_obj': page_obj,
+        'more_url': more_url('posts:index_fragment', page_obj),
         'index': True
     }
-    return render(request, template, context)
+    return render_streaming(
+        request, template, context, page_obj,
+        'posts/includes/post_list.html', 'posts'
+    )
+
+
+def trending(request):
+    posts = Post.objects.visible().filter(
+        rank__isnull=False
+    ).select_related('author', 'group').order_by('-rank__score')
+    page_obj = cached_page(
+        f'trending:{content_version()}:{trending_version()}',
+        posts,
+        request.GET.get('page'),
+        timeout=settings.FEED_CACHE_TIMEOUT
+    )
+    context = {
+        'page_obj': page_obj,
+        'trending': True
+    }
+    return render(request, 'posts/trending.html', context)
 
 
 def group_list(request, slug):
     template = 'posts/group_list.html'
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_group_or_404(slug)
+    posts = group.posts.visible().select_related('author')
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'group': group,
+        'page_obj': page_obj,
+        'more_url': more_url('posts:group_fragment', page_obj, slug)
+    }
+    return render_streaming(
+        request, template, context, page_obj,
+        'posts/includes/post_list.html', 'posts'
+    )
+
+
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    # Порядок по копии даты в PostTag читается из индекса (tag, pub_date)
+    posts = Post.objects.visible().filter(
+        post_tags__tag=tag
+    ).select_related('author', 'group').order_by('-post_tags__pub_date')
+    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'group': tag,
         'page_obj': page_obj
     }
-    return render(request, template, context)
+    return render_streaming(
+        request, 'posts/group_list.html', context, page_obj,
+        'posts/includes/post_list.html', 'posts'
+    )
 
 
-def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    current_user = request.user
+def tag_cloud(request):
+    context = {
+        'tags': get_or_compute(
+            f'tag_cloud:{content_version()}', tags.cloud,
+            timeout=settings.FEED_CACHE_TIMEOUT
+        )
+    }
+    return render(request, 'posts/tags.html', context)
 
-    if current_user.is_authenticated:
-        following = current_user.follower.filter(author=author).exists()
-    else:
-        following = False
 
-    posts = Post.objects.filter(author=author.id)
-    posts_count = posts.count()
+def profile(request, username):
+    author = get_object_or_404(User, pk=get_user_id_or_404(username))
+    posts = Post.objects.filter(author=author.id).select_related('group')
+    posts_count = posts_count_for(author)
 
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
@@ -57,34 +234,74 @@ def profile(request, username):
     context = {
         'author': author,
         'page_obj': page_obj,
-        'posts_count': posts_count,
-        'following': following
+        'more_url': more_url('posts:profile_fragment', page_obj, username),
+        'posts_count': posts_count
     }
 
-    return render(request, 'posts/profile.html', context)
+    return render_streaming(
+        request, 'posts/profile.html', context, page_obj,
+        'posts/includes/post_list.html', 'posts', profile=True
+    )
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user and not request.user.is_staff:
+        raise PermissionDenied
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        raise Http404
+    export, content_type = FORMATS[export_format]
+    response = StreamingHttpResponse(export(author), content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.{export_format}"'
+    )
+    return response
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
+    view_counter.hit(post.pk)
+    comments = Comment.objects.visible().filter(
+        post=post
+    ).select_related('author')
+    if streaming_enabled(request):
+        # Комментарии уходят браузеру порциями все сразу
+        comments, cursor = comments.iterator(), None
+    else:
+        # ?after= - следующая порция без JS, по обычной ссылке
+        comments, cursor = keyset_page(
+            comments, request.GET.get('after'),
+            settings.POSTS_PER_PAGE, 'created'
+        )
     author = post.author
-    author_posts_count = Post.objects.filter(author=post.author).count()
+    author_posts_count = posts_count_for(post.author)
     form = CommentForm(request.POST or None)
 
     context = {
         'post': post,
         'author': author,
         'author_posts_count': author_posts_count,
+        'views': post.views + view_counter.pending_for(post.pk),
         'form': form,
-        'comments': comments
+        'comments': comments,
+        'post_id': post.pk,
+        'cursor': cursor,
+        'more_url': cursor and '{}?after={}'.format(
+            reverse('posts:comments_fragment', args=(post.pk,)), cursor
+        )
     }
 
-    return render(request, 'posts/post_detail.html', context)
+    return render_streaming(
+        request, 'posts/post_detail.html', context, comments,
+        'posts/includes/comment_list.html', 'comments'
+    )
 
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -104,7 +321,16 @@ def post_create(request):
 
     if form.is_valid():
         form.instance.author = author
-        form.save()
+        post = form.save()
+        transaction.on_commit(hub.publish)
+        # Подписчики уведомляются фоновыми задачами: работа запроса
+        # не зависит от их числа
+        event = PostEvent.objects.create(post=post)
+        enqueue(notify_followers, (event.pk,),
+                idempotency_key=f'notify:{event.pk}:0')
+        if post.image:
+            enqueue(warm_thumbnails, (post.pk,),
+                    idempotency_key=f'thumbnails:{post.pk}')
         return redirect('posts:profile', author)
 
     context = {
@@ -126,7 +352,10 @@ def post_edit(request, post_id):
         )
 
         if request.method == 'POST' and form.is_valid():
-            form.save()
+            post = form.save()
+            if 'image' in form.changed_data and post.image:
+                enqueue(warm_thumbnails, (post.pk,),
+                        idempotency_key=f'thumbnails:{post.pk}')
             return redirect('posts:post_detail', post_id)
 
         context = {
@@ -139,31 +368,84 @@ def post_edit(request, post_id):
     return redirect('posts:post_detail', post_id)
 
 
+@login_required
+def notifications(request):
+    items = Notification.objects.filter(
+        user=request.user
+    ).select_related('author', 'post')
+    paginator = Paginator(items, settings.POSTS_PER_PAGE)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'page_obj': page_obj
+    }
+    response = render(request, 'posts/notifications.html', context)
+    Notification.objects.filter(
+        user=request.user, is_read=False
+    ).update(is_read=True)
+    return response
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = Post.objects.visible().filter(
+        author__following__user=request.user
+    ).select_related('author', 'group')
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     context = {
         'page_obj': page_obj,
+        'more_url': more_url('posts:follow_fragment', page_obj),
         'follow': True
     }
 
-    return render(request, 'posts/follow.html', context)
+    return render_streaming(
+        request, 'posts/follow.html', context, page_obj,
+        'posts/includes/post_list.html', 'posts'
+    )
+
+
+def last_event_id(request):
+    value = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get(
+        'last_id'
+    )
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def event_response(events):
+    response = HttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def stream(request):
+    return event_response(event_batch(last_event_id(request)))
+
+
+@login_required
+def follow_stream(request):
+    authors = set(follows.for_request(request))
+    return event_response(event_batch(last_event_id(request), authors))
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    if author != request.user:
-        Follow.objects.get_or_create(user=request.user, author=author)
+    author_id = get_user_id_or_404(username)
+    if author_id != request.user.pk:
+        Follow.objects.get_or_create(user=request.user, author_id=author_id)
+    # Без изменений сигнала нет, а кэш мог разойтись с БД
+    follows.forget([request.user.pk])
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    author_id = get_user_id_or_404(username)
+    Follow.objects.filter(user=request.user, author_id=author_id).delete()
+    follows.forget([request.user.pk])
     return redirect('posts:profile', username)
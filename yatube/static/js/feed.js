@@ -0,0 +1,67 @@
+// Оповещение о новых постах через Server-Sent Events
+(function () {
+  var banner = document.querySelector('[data-stream]');
+  if (!banner || !window.EventSource) {
+    return;
+  }
+  var count = 0;
+  // Недавние посты приходят повторно, пока не подтверждены сервером
+  var seen = {};
+  var source = new EventSource(banner.dataset.stream);
+  source.addEventListener('post', function (event) {
+    var id = JSON.parse(event.data).id;
+    if (seen[id]) {
+      return;
+    }
+    seen[id] = true;
+    count += 1;
+    banner.textContent = 'Новых постов: ' + count + '. Обновить';
+    banner.hidden = false;
+  });
+})();
+
+// Бесконечная прокрутка: следующая порция ленты подгружается
+// фрагментом, когда пользователь долистал до конца
+(function () {
+  var feed = document.querySelector('[data-feed]');
+  if (!feed || !window.IntersectionObserver || !window.fetch) {
+    return;
+  }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) {
+        return;
+      }
+      var more = entry.target;
+      observer.unobserve(more);
+      fetch(more.dataset.more, {credentials: 'same-origin'})
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error(response.statusText);
+          }
+          return response.text();
+        })
+        .then(function (html) {
+          more.insertAdjacentHTML('beforebegin', html);
+          more.remove();
+          watch();
+        })
+        .catch(function () {
+          // Без фрагментов остаётся обычная навигация по страницам
+          if (pagination) {
+            pagination.hidden = false;
+          }
+        });
+    });
+  });
+  function watch() {
+    feed.querySelectorAll('[data-more]').forEach(function (more) {
+      observer.observe(more);
+    });
+  }
+  var pagination = document.querySelector('.pagination');
+  if (pagination && feed.querySelector('[data-more]')) {
+    pagination.hidden = true;
+  }
+  watch();
+})();
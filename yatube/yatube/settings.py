@@ -10,7 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -39,6 +43,7 @@ INSTALLED_APPS = [
     'about.apps.AboutConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -50,14 +55,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.AccessLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryLogMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'core.middleware.PageCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -76,6 +86,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'posts.context_processors.notifications',
             ],
         },
     },
@@ -138,10 +149,15 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:posts_index'
 
+# Письма сохраняются в БД и отправляются задачей run_worker через
+# QUEUED_EMAIL_BACKEND пачками по EMAIL_BATCH_SIZE на одно соединение
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
 #  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_ATTEMPTS = 5
 
 INTERNAL_IPS = [
     '127.0.0.1',
@@ -151,11 +167,210 @@ POSTS_PER_PAGE = 10
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+# Под тестами загрузки, журналы и профили пишутся во временный
+# каталог, который удаляется при выходе, а не в дерево исходников
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+if TESTING:
+    OUTPUT_DIR = tempfile.mkdtemp(prefix='yatube-tests-')
+    atexit.register(shutil.rmtree, OUTPUT_DIR, ignore_errors=True)
+else:
+    OUTPUT_DIR = BASE_DIR
+
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_ROOT = os.path.join(OUTPUT_DIR, 'media')
 
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Очереди фоновых задач и сколько задач каждой очереди
+# может выполняться одновременно (python manage.py run_worker)
+JOBS_QUEUES = {
+    'default': 2,
+    'media': 1,
+    'mail': 1,
+}
+# Базовая задержка повтора упавшей задачи, секунды; растёт как 2**n
+JOBS_RETRY_DELAY = 10
+JOBS_POLL_INTERVAL = 1
+# Через сколько секунд задача без ответа от воркера считается зависшей
+JOBS_STALE_TIMEOUT = 600
+
+# Как часто (в секундах) накопленные просмотры постов пишутся в БД
+POST_VIEWS_FLUSH_INTERVAL = 5
+
+# Рейтинг популярных постов (python manage.py refresh_trending)
+# Учитываются посты не старше окна и комментарии за последние часы
+TRENDING_WINDOW_HOURS = 7 * 24
+TRENDING_VELOCITY_HOURS = 24
+TRENDING_COMMENT_WEIGHT = 3
+TRENDING_VIEW_WEIGHT = 1
+TRENDING_GRAVITY = 1.5
+TRENDING_REFRESH_INTERVAL = 300
+
+# Сколько строк за раз читается из БД при выгрузке данных пользователя
+EXPORT_CHUNK_SIZE = 500
+
+# Варианты картинок постов для {% responsive_image %}: ширины в пикселях,
+# пропорции кадра и форматы (последний - запасной для <img>)
+RESPONSIVE_IMAGE_WIDTHS = (320, 640, 960)
+RESPONSIVE_IMAGE_RATIO = (960, 339)
+RESPONSIVE_IMAGE_FORMATS = ('WEBP', 'JPEG')
+RESPONSIVE_IMAGE_SIZES = '(min-width: 992px) 960px, 100vw'
+# Сколько секунд помнить список вариантов картинки (core.images)
+RESPONSIVE_IMAGE_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Кэш страниц для анонимных пользователей: представление и параметры
+# запроса, от которых зависит страница
+PAGE_CACHE_TIMEOUT = 60
+PAGE_CACHE_VIEWS = {
+    'posts:index': ('page',),
+    'posts:group_list': ('page',),
+    'posts:profile': ('page',),
+    'posts:post_detail': ('after',),
+    'about:author': (),
+    'about:tech': (),
+}
+
+# Сколько секунд живут закэшированные ленты и счётчики (core.cache)
+FEED_CACHE_TIMEOUT = 60
+
+# Кэш сопоставления slug группы и имени пользователя с объектами;
+# отсутствующие адреса кэшируются ненадолго
+RESOLVE_CACHE_TIMEOUT = 60 * 60
+RESOLVE_MISSING_TIMEOUT = 30
+
+# Поток новых постов (Server-Sent Events, /stream/ и /follow/stream/):
+# сколько постов помнит процесс, как часто проверяется БД и через
+# сколько секунд браузер снова спрашивает о новых постах. Ответ
+# закрывается сразу, соединение между опросами не держится.
+# SSE_COMMIT_GRACE - сколько секунд пост с меньшим id может
+# коммититься позже поста с большим, не теряясь для потока
+SSE_BUFFER_SIZE = 1000
+SSE_POLL_INTERVAL = 2
+SSE_RETRY = 3
+SSE_COMMIT_GRACE = 10
+
+# Потоковая отрисовка длинных страниц: начало страницы уходит сразу,
+# список постов или комментариев - порциями (python manage.py
+# measure_ttfb сравнивает время до первого байта)
+STREAM_RENDER_VIEWS = ()
+STREAM_CHUNK_SIZE = 20
+
+# Профилирование представлений (core.middleware.ProfilerMiddleware):
+# доля случайных запросов, заголовок с подписанным токеном, режим
+# 'cprofile' или 'sampling' (flame graph), каталог и сколько файлов
+# хранить для каждого представления
+PROFILER_SAMPLE_RATE = 0
+PROFILER_HEADER = 'X-Profile'
+PROFILER_TOKEN_MAX_AGE = 60 * 60
+PROFILER_MODE = 'cprofile'
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_DIR = os.path.join(OUTPUT_DIR, 'profiles')
+PROFILER_KEEP = 50
+
+# Журнал SQL-запросов (python manage.py query_report): запросы дольше
+# порога в миллисекундах и запросы, повторившиеся за один HTTP-запрос
+SLOW_QUERY_THRESHOLD = 100
+REPEATED_QUERY_THRESHOLD = 10
+LOG_DIR = os.path.join(OUTPUT_DIR, 'logs')
+QUERY_LOG_FILE = os.path.join(LOG_DIR, 'queries.log')
+
+# Журналы пишет фоновый поток (core.logs.AsyncHandler) пачками в файлы
+# с ротацией по размеру: access.log - запросы, app.log - приложение,
+# queries.log - SQL
+ACCESS_LOG_FILE = os.path.join(LOG_DIR, 'access.log')
+APP_LOG_FILE = os.path.join(LOG_DIR, 'app.log')
+LOG_FILE_HANDLER = {
+    'class': 'core.logs.AsyncHandler',
+    'target': 'core.logs.BatchingRotatingFileHandler',
+    'maxBytes': 10 * 1024 * 1024,
+    'backupCount': 5,
+    'batch_size': 100,
+    'flush_interval': 1,
+    'delay': True,
+    'encoding': 'utf-8',
+    'formatter': 'json',
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.logs.JsonFormatter'},
+    },
+    'handlers': {
+        'access': {**LOG_FILE_HANDLER, 'filename': ACCESS_LOG_FILE},
+        'app': {**LOG_FILE_HANDLER, 'filename': APP_LOG_FILE},
+        'queries': {**LOG_FILE_HANDLER, 'filename': QUERY_LOG_FILE},
+    },
+    'root': {
+        'handlers': ['app'],
+        'level': 'INFO',
+    },
+    'loggers': {
+        'yatube.access': {
+            'handlers': ['access'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'yatube.queries': {
+            'handlers': ['queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Уведомления подписчикам о новых постах: сколько подписчиков
+# обрабатывает одна задача и как часто рассылаются письма-сводки
+# (python manage.py send_digests --schedule)
+NOTIFICATIONS_CHUNK_SIZE = 500
+NOTIFICATIONS_DIGEST_INTERVAL = 24 * 60 * 60
+
+# Удаление пользователей и групп из админки: объект сразу скрывается,
+# а связанные записи удаляются фоновыми задачами порциями такого размера
+PURGE_CHUNK_SIZE = 500
+
+# Сколько самых частых хештегов показывать в облаке /tags/
+TAG_CLOUD_SIZE = 50
+
+# Рекомендации подписок (python manage.py refresh_suggestions --schedule):
+# сколько хранить и показывать на пользователя, как часто пересчитывать
+# и выше какого числа подписчиков автор не участвует в мере похожести
+SUGGESTIONS_PER_USER = 20
+SUGGESTIONS_SHOWN = 5
+SUGGESTIONS_REFRESH_INTERVAL = 24 * 60 * 60
+SUGGESTIONS_MAX_FANOUT = 1000
+
+# Сколько живёт закэшированный набор подписок пользователя
+# (posts.follows); подписка и отписка сбрасывают его сразу
+FOLLOW_SET_TIMEOUT = 5 * 60
+
+# Почти одинаковые посты (posts.minhash): тексты короче
+# DUPLICATE_MIN_TOKENS слов не проверяются; повтором считается пост
+# с оценкой сходства пар слов не ниже DUPLICATE_SIMILARITY. Повтор
+# отклоняется ('reject') или сохраняется с пометкой ('flag')
+DUPLICATE_MIN_TOKENS = 10
+DUPLICATE_SIMILARITY = 0.6
+DUPLICATE_POST_ACTION = 'reject'
+
+# Ограничение частоты запросов к пишущим представлениям
+# (core.ratelimit): имя URL -> (сколько запросов подряд, за сколько
+# секунд корзина наполняется снова, какие методы считаются). Считаются
+# отдельно для каждого пользователя, а для гостей - для каждого
+# IP-адреса. Показ форм не считается; подписка и отписка меняют данные
+# GET-запросом
+RATE_LIMITS = {
+    'posts:create_post': (30, 60, ('POST',)),
+    'posts:add_comment': (30, 60, ('POST',)),
+    'posts:profile_follow': (60, 60, ('GET', 'POST')),
+    'posts:profile_unfollow': (60, 60, ('GET', 'POST')),
+    'users:signup': (20, 60, ('POST',)),
+}
+# Заголовок с IP-адресом клиента, который выставляет свой прокси
+# (например, 'HTTP_X_REAL_IP' для nginx с proxy_set_header X-Real-IP).
+# None - прокси нет, адрес берётся из REMOTE_ADDR
+RATE_LIMIT_IP_HEADER = None